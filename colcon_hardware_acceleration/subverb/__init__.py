@@ -1,14 +1,15 @@
 # Copyright 2022 Víctor Mayoral-Vilches
 # Licensed under the Apache License, Version 2.0
 
+import functools
 import os
-import subprocess
+import re
+import stat
 import sys
 
 from colcon_core.logging import colcon_logger
-from colcon_core.plugin_system import instantiate_extensions
-from colcon_core.plugin_system import order_extensions_by_name
-from colcon_hardware_acceleration.verb import gray, yellow, red, green
+from colcon_core.plugin_system import satisfies_version
+from colcon_hardware_acceleration.verb import gray, red, green
 
 logger = colcon_logger.getChild(__name__)
 
@@ -20,6 +21,161 @@ mountpointn = "/tmp/sdcard_img_p"
 mountpoint1 = "/tmp/sdcard_img_p1"
 mountpoint2 = "/tmp/sdcard_img_p2"
 
+# "fdisk -l" output of a raw image, e.g.:
+#
+# Units: sectors of 1 * 512 = 512 bytes
+# ...
+# Device       Boot   Start     End Sectors  Size Id Type
+# sd_card.img1 *       2048 1148927 1146880  560M  c W95 FAT32 (LBA)
+# sd_card.img2      1148928 6703103 5554176  2.7G 83 Linux
+_FDISK_UNITS_RE = re.compile(r"^Units:.*=\s*(\d+)", re.MULTILINE)
+# partition rows, after the image path fdisk echoes as device name prefix; a
+# "p" separates the partition number from a path ending in a digit (disk2p1)
+_FDISK_PARTITION_RE = re.compile(r"p?(\d+)\s+(?:\*\s+)?(\d+)\s")
+
+# MBR partition table of a raw image, read by _read_mbr(): 4 primary partition
+# entries of 16 bytes at offset 446, with their (LBA) start sector at offset 8
+_MBR_SECTOR_SIZE = 512
+# left to fdisk: GPT (protective MBR) and extended partitions
+_MBR_FALLBACK_TYPES = (0xEE, 0x05, 0x0F, 0x85)
+
+# raw image paths already confirmed on disk by get_rawimage_path()
+_rawimage_paths = set()
+
+
+def _memoize(function):
+    """
+    Memoize the result of a workspace lookup helper.
+
+    Cached results are dropped on each call while the COLCON_ACCEL_NOCACHE
+    environment variable is set, e.g. when firmware is swapped in-process.
+    """
+    cached_function = functools.lru_cache(maxsize=1)(function)
+
+    @functools.wraps(function)
+    def wrapper():
+        if os.environ.get("COLCON_ACCEL_NOCACHE"):
+            cached_function.cache_clear()
+        return cached_function()
+
+    wrapper.cache_clear = cached_function.cache_clear
+    return wrapper
+
+
+if os.name == "posix":
+    # a single access(F_OK) syscall, without filling a stat struct
+    def _fast_exists(path):
+        return os.access(path, os.F_OK)
+
+else:
+    _fast_exists = os.path.exists
+
+
+@functools.lru_cache(maxsize=256)
+def _exists(path):
+    """
+    Memoized os.path.exists() for the workspace path helpers.
+
+    run() drops the cache since any subprocess may change the filesystem,
+    call reset_path_cache() after other changes.
+
+    :rtype: Bool
+    """
+    return _fast_exists(path)
+
+
+def reset_path_cache():
+    """
+    Forget the cached existence of workspace paths and raw images.
+
+    To be called by subverbs after changing the filesystem by means other
+    than run() (e.g. os.unlink(), shutil) or the working directory, so that
+    the path helpers probe it again.
+    """
+    _pwd.cache_clear()
+    get_firmware_root.cache_clear()
+    _select_dir.cache_clear()
+    get_workspace_path.cache_clear()
+    _get_board_cached.cache_clear()
+    _get_platform_cached.cache_clear()
+    _exists.cache_clear()
+    _resolve_xilinx_dir.cache_clear()
+    _rawimage_paths.clear()
+
+
+@_memoize
+def _pwd():
+    """
+    Get the current workspace directory, read once from the environment.
+
+    :rtype: String
+    """
+    return os.environ.get("PWD") or os.getcwd()
+
+
+@_memoize
+def get_firmware_root():
+    """
+    Get the path to the firmware deployed in the workspace, whether selected
+    or not. Lives at "<path-to-ros2-ws>/acceleration/firmware".
+
+    :rtype: String
+    """
+    return os.path.join(_pwd(), "acceleration", "firmware")
+
+
+@_memoize
+def _select_dir():
+    """
+    Get the path to the selected firmware, derived once from _pwd().
+
+    :rtype: String
+    """
+    return os.path.join(get_firmware_root(), "select")
+
+
+# hints of the FileNotFoundError raised by the path helpers below
+_HINT_WORKSPACE = (
+    "this command from the root directory of the workspace "
+    + "after {}. \n"
+    + "Try 'colcon build --merge-install' first."
+)
+_HINT_XILINX = _HINT_WORKSPACE.format("xilinx's firmware has been deployed")
+
+
+def _required_path(path, hint):
+    """
+    Check that path exists, raise FileNotFoundError with hint otherwise.
+
+    :rtype: String
+    """
+    if _exists(path):
+        return path
+    raise FileNotFoundError(path, hint)
+
+
+def _xilinx_dir(variable, name):
+    """
+    Get the path to a Xilinx tool, from variable or PWD/xilinx/<name>.
+
+    :rtype: String
+    """
+    return _resolve_xilinx_dir(variable, os.environ.get(variable), _pwd(), name)
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_xilinx_dir(variable, override, pwd, name):
+    """
+    Resolve _xilinx_dir(), memoized on the variable's value and PWD.
+
+    :rtype: String
+    """
+    # fall back to the current directory when the variable is unset or empty
+    path = override or os.path.join(pwd, "xilinx", name)
+    return _required_path(
+        path, f"consider setting {variable} or running {_HINT_XILINX}"
+    )
+
 
 class AccelerationSubverbExtensionPoint:
     """
@@ -33,6 +189,11 @@ class AccelerationSubverbExtensionPoint:
     """The version of the vitis subverb extension interface."""
     EXTENSION_POINT_VERSION = "1.0"
 
+    def __init_subclass__(cls, **kwargs):
+        """Check the extension point version once per subverb class."""
+        super().__init_subclass__(**kwargs)
+        satisfies_version(cls.EXTENSION_POINT_VERSION, "^1.0")
+
     def add_arguments(self, *, parser):
         """
         Add command line arguments specific to the subverb.
@@ -63,20 +224,7 @@ class AccelerationSubverbExtensionPoint:
 
         :rtype: String
         """
-        current_dir = os.environ.get("PWD", "")
-        board_file = current_dir + "/acceleration/firmware/select/BOARD"
-        if os.path.exists(board_file):
-            with open(board_file, "r") as myfile:
-                data = myfile.readlines()
-                return data[0].strip()
-        else:
-            raise FileNotFoundError(
-                board_file,
-                "consider running "
-                + "this command from the root directory of the workspace "
-                + "after xilinx's firmware has been deployed. \n"
-                + "Try 'colcon build --merge-install' first.",
-            )
+        return _get_board_cached()
 
     def get_platform(self):
         """
@@ -89,10 +237,22 @@ class AccelerationSubverbExtensionPoint:
 
         :rtype: String
         """
-        platform_dir = get_platform_dir()
-        cmd = "ls " + platform_dir + " | grep xpfm"
-        outs, errs = run(cmd, shell=True)
-        return outs.replace(".xpfm", "")
+        return _get_platform_cached()
+
+
+@_memoize
+def _get_board_cached():
+    """
+    Get the board name out of the BOARD file of the selected firmware.
+
+    :rtype: String
+    """
+    board_file = os.path.join(_select_dir(), "BOARD")
+    try:
+        with open(board_file, "rb") as myfile:
+            return myfile.readline().strip().decode()
+    except FileNotFoundError:
+        raise FileNotFoundError(board_file, "consider running " + _HINT_XILINX) from None
 
 
 def get_subverb_extensions():
@@ -100,29 +260,43 @@ def get_subverb_extensions():
     Get the available subverb extensions.
     The extensions are ordered by their entry point name.
 
+    Entry points don't change during a process lifetime, the extensions
+    are discovered and instantiated once; each call returns a new mapping
+    of the same instances. Call _discover_subverb_extensions.cache_clear()
+    to discover them again (e.g. in tests).
+
     :rtype: OrderedDict
     """
+    return _discover_subverb_extensions().copy()
+
+
+@functools.lru_cache(maxsize=1)
+def _discover_subverb_extensions():
+    # only needed once, when the verb adds the subverbs' arguments
+    from colcon_core.plugin_system import instantiate_extensions
+    from colcon_core.plugin_system import order_extensions_by_name
+
     extensions = instantiate_extensions(__name__)
     for name, extension in extensions.items():
         extension.SUBVERB_NAME = name
     return order_extensions_by_name(extensions)
 
 
+@_memoize
 def get_workspace_path():
     """
     Get the path to the current colcon workspace
 
     :rtype: String
     """
-    current_dir = os.environ.get("PWD", "")
-    if os.path.exists(current_dir) and os.path.exists(current_dir + "/src"):
+    current_dir = _pwd()
+    if _exists(os.path.join(current_dir, "src")):
         return current_dir
-    else:
-        raise FileNotFoundError(
-            current_dir,
-            "consider running "
-            + "this command from the root directory of the colcon workspace ",
-        )
+    raise FileNotFoundError(
+        current_dir,
+        "consider running "
+        + "this command from the root directory of the colcon workspace ",
+    )
 
 
 def get_workspace_dir():
@@ -143,23 +317,7 @@ def get_vitis_dir():
 
     :rtype: String
     """
-    if "XILINX_VITIS" in os.environ:
-        vitis_dir = os.getenv("XILINX_VITIS")
-    else:
-        # take it from current directory
-        current_dir = os.environ.get("PWD", "")
-        vitis_dir = current_dir + "/xilinx/vitis"
-
-    if os.path.exists(vitis_dir):
-        return vitis_dir
-    else:
-        raise FileNotFoundError(
-            vitis_dir,
-            "consider setting XILINX_VITIS or running "
-            + "this command from the root directory of the workspace "
-            + "after xilinx's firmware has been deployed. \n"
-            + "Try 'colcon build --merge-install' first.",
-        )
+    return _xilinx_dir("XILINX_VITIS", "vitis")
 
 
 def get_vivado_dir():
@@ -170,23 +328,7 @@ def get_vivado_dir():
 
     :rtype: String
     """
-    if "XILINX_VIVADO" in os.environ:
-        vivado_dir = os.getenv("XILINX_VIVADO")
-    else:
-        # take it from current directory
-        current_dir = os.environ.get("PWD", "")
-        vivado_dir = current_dir + "/xilinx/vivado"
-
-    if os.path.exists(vivado_dir):
-        return vivado_dir
-    else:
-        raise FileNotFoundError(
-            vivado_dir,
-            "consider setting XILINX_VIVADO or running "
-            + "this command from the root directory of the workspace "
-            + "after xilinx's firmware has been deployed. \n"
-            + "Try 'colcon build --merge-install' first.",
-        )
+    return _xilinx_dir("XILINX_VIVADO", "vivado")
 
 
 def get_vitis_hls_dir():
@@ -197,23 +339,7 @@ def get_vitis_hls_dir():
 
     :rtype: String
     """
-    if "XILINX_HLS" in os.environ:
-        vitis_hls_dir = os.getenv("XILINX_HLS")
-    else:
-        # take it from current directory
-        current_dir = os.environ.get("PWD", "")
-        vitis_hls_dir = current_dir + "/xilinx/vitis_hls"
-
-    if os.path.exists(vitis_hls_dir):
-        return vitis_hls_dir
-    else:
-        raise FileNotFoundError(
-            vitis_hls_dir,
-            "consider setting XILINX_HLS or running "
-            + "this command from the root directory of the workspace "
-            + "after xilinx's firmware has been deployed. \n"
-            + "Try 'colcon build --merge-install' first.",
-        )
+    return _xilinx_dir("XILINX_HLS", "vitis_hls")
 
 
 def get_build_dir():
@@ -222,18 +348,11 @@ def get_build_dir():
 
     :rtype: String
     """
-    current_dir = os.environ.get("PWD", "")
-    build_dir = current_dir + "/build"
-    if os.path.exists(build_dir):
-        return build_dir
-    else:
-        raise FileNotFoundError(
-            build_dir,
-            "consider running "
-            + "this command from the root directory of the workspace "
-            + "after building the colcon workspace overlay. \n"
-            + "Try 'colcon build --merge-install' first.",
-        )
+    return _required_path(
+        os.path.join(_pwd(), "build"),
+        "consider running "
+        + _HINT_WORKSPACE.format("building the colcon workspace overlay"),
+    )
 
 
 def get_firmware_dir():
@@ -245,9 +364,8 @@ def get_firmware_dir():
 
     :rtype: String
     """
-    current_dir = os.environ.get("PWD", "")
-    firmware_dir = current_dir + "/acceleration/firmware/select"
-    if os.path.exists(firmware_dir):
+    firmware_dir = _select_dir()
+    if _exists(firmware_dir):
         return firmware_dir
     else:
         # raise FileNotFoundError(
@@ -257,7 +375,7 @@ def get_firmware_dir():
         #     + "after firmware has been deployed. \n"
         #     + "Try 'colcon build --merge-install' first.",
         # )
-        red("Firmware directory (" + firmware_dir + ") not found.")
+        red(f"Firmware directory ({firmware_dir}) not found.")
         return None
 
 
@@ -271,18 +389,30 @@ def get_platform_dir():
 
     :rtype: String
     """
-    current_dir = os.environ.get("PWD", "")
-    platform_dir = current_dir + "/acceleration/firmware/select/platform"
-    if os.path.exists(platform_dir):
-        return platform_dir
-    else:
+    return _required_path(
+        os.path.join(_select_dir(), "platform"),
+        "consider running "
+        + _HINT_WORKSPACE.format("firmware has been deployed"),
+    )
+
+
+@_memoize
+def _get_platform_cached():
+    """
+    Get the platform name out of the .xpfm file in the platform directory.
+
+    :rtype: String
+    """
+    platform_dir = get_platform_dir()
+    with os.scandir(platform_dir) as entries:
+        platforms = [e.name for e in entries if e.name.endswith(".xpfm")]
+    if not platforms:
         raise FileNotFoundError(
-            platform_dir,
-            "consider running "
-            + "this command from the root directory of the workspace "
-            + "after firmware has been deployed. \n"
-            + "Try 'colcon build --merge-install' first.",
+            platform_dir + "/*.xpfm",
+            "no platform file found in the platform directory.",
         )
+    # deterministic pick, independent of the directory order
+    return min(platforms)[: -len(".xpfm")]
 
 
 def get_install_dir(install_dir_input="install"):
@@ -291,17 +421,12 @@ def get_install_dir(install_dir_input="install"):
 
     :rtype: String
     """
-    current_dir = os.environ.get("PWD", "")
-    install_dir = current_dir + "/" + install_dir_input
-    if os.path.exists(install_dir):
-        return install_dir
-    else:
-        raise FileNotFoundError(
-            install_dir,
-            "no install directory "
-            + "found in the current workspace. Consider building it first. "
-            + "Try 'colcon build --merge-install'.",
-        )
+    return _required_path(
+        os.path.join(_pwd(), install_dir_input),
+        "no install directory "
+        + "found in the current workspace. Consider building it first. "
+        + "Try 'colcon build --merge-install'.",
+    )
 
 
 def check_install_directory(installdir=None):
@@ -310,15 +435,8 @@ def check_install_directory(installdir=None):
 
     :rtype: Bool
     """
-    current_dir = os.environ.get("PWD", "")
-    if installdir:
-        install_dir = current_dir + "/" + installdir
-    else:
-        install_dir = current_dir + "/install"
-    if os.path.exists(install_dir):
-        return True
-    else:
-        return False
+    install_dir = os.path.join(_pwd(), installdir or "install")
+    return _exists(install_dir)
 
 
 def get_rawimage_path(rawimage_filename="sd_card.img"):
@@ -332,37 +450,153 @@ def get_rawimage_path(rawimage_filename="sd_card.img"):
     :rtype: String
     """
     firmware_dir = get_firmware_dir()
-    rawimage_path = firmware_dir + "/" + rawimage_filename
-    if os.path.exists(rawimage_path):
+    rawimage_path = os.path.join(firmware_dir, rawimage_filename)
+    if rawimage_path in _rawimage_paths:
         return rawimage_path
-    else:
+
+    # a single stat() tells both existence and file type
+    try:
+        rawimage_stat = os.stat(rawimage_path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(rawimage_stat.st_mode) or not rawimage_stat.st_size:
         return None
+    _rawimage_paths.add(rawimage_path)
+    return rawimage_path
 
 
-def run(cmd, shell=False, timeout=1):
+def get_rawimage_partitions(rawimage_path):
+    """
+    Inspect the partition table of a raw image, out of its MBR or with a
+    single fdisk call otherwise.
+
+    Successful fdisk results are memoized per image path and modification
+    time.
+
+    param: rawimage_path, the path of the raw disk image obtained by calling
+    get_rawimage_path()
+
+    return: (units, start sector by partition number, output to report),
+    units is None if it couldn't be parsed
+    """
+    # the partition table of a raw image is usually a plain MBR, read it
+    #  directly instead of spawning fdisk
+    try:
+        startsectors = _read_mbr(rawimage_path)
+    except OSError as e:
+        return None, {}, str(e)
+    if startsectors:
+        return _MBR_SECTOR_SIZE, startsectors, f"MBR start sectors: {startsectors}"
+
+    # the stat() that keys the cache also checks the image is (still) there
+    try:
+        mtime = os.stat(rawimage_path).st_mtime_ns
+    except OSError as e:
+        return None, {}, str(e)
+    partitions = _parse_fdisk(rawimage_path, mtime)
+    if partitions[0] is None:
+        # don't keep failures around, e.g. fdisk timing out on a busy disk
+        _parse_fdisk.cache_clear()
+    return partitions
+
+
+def _read_mbr(rawimage_path):
+    """
+    Read the start sectors of the primary partitions out of an MBR.
+
+    return: start sector by partition number, None if the image has no
+    plain MBR partition table (e.g. GPT or extended partitions)
+    """
+    with open(rawimage_path, "rb") as f:
+        mbr = f.read(_MBR_SECTOR_SIZE)
+    if len(mbr) < _MBR_SECTOR_SIZE or mbr[510:512] != b"\x55\xaa":
+        return None
+    startsectors = {}
+    for number in range(1, 5):
+        entry = mbr[446 + 16 * (number - 1) : 446 + 16 * number]
+        # boot flag other than 0x00/0x80: a boot sector, not a partition table
+        if entry[0] not in (0x00, 0x80) or entry[4] in _MBR_FALLBACK_TYPES:
+            return None
+        start = int.from_bytes(entry[8:12], "little")
+        if entry[4] and start:
+            startsectors[number] = start
+    return startsectors or None
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_fdisk(rawimage_path, mtime):
+    # C locale, so that the parsed headers aren't translated
+    outs, errs = run(
+        ["fdisk", "-l", rawimage_path], timeout=5, env=dict(os.environ, LC_ALL="C")
+    )
+    outs = outs or ""
+    units = _FDISK_UNITS_RE.search(outs)
+    startsectors = {}
+    for line in outs.splitlines():
+        if line.startswith(rawimage_path):
+            row = _FDISK_PARTITION_RE.match(line, len(rawimage_path))
+            if row:
+                startsectors[int(row.group(1))] = int(row.group(2))
+    return (int(units.group(1)) if units else None), startsectors, outs
+
+
+def _sudo(*argv):
+    """
+    Prefix argv with sudo, unless already running as root.
+
+    Skips spawning sudo (and its authentication) when e.g. running in a
+    privileged container or CI job.
+
+    :rtype: List
+    """
+    if os.geteuid() == 0:
+        return list(argv)
+    return ["sudo"] + list(argv)
+
+
+def run(cmd, *, shell=False, timeout=None, env=None):
     """
     Spawns a new process launching cmd, connect to their input/output/error pipes, and obtain their return codes.
 
+    Lists are executed directly, without a shell; pass shell=True to run
+    cmd as a shell command line instead. Waits for the process to finish
+    unless a timeout (in seconds) is given, after which it is killed.
+
     :param cmd: command split in the form of a list
-    :returns: stdout
+    :param env: environment of the process, defaults to the current one
+    :returns: stdout, and stderr if the process failed (each stripped, or None),
+        a failure without stderr gets a message with its return code
     """
-    proc = subprocess.Popen(
-        cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=shell
-    )
-    try:
-        outs, errs = proc.communicate(timeout=timeout)
-    except subprocess.TimeoutExpired:
-        proc.kill()
-        outs, errs = proc.communicate()
-
-    # decode, or None
-    if outs:
-        outs = outs.decode("utf-8").strip()
-    else:
-        outs = None
+    # imported here, every subverb loads this module but only a few of them
+    # spawn processes
+    import subprocess
 
-    if errs and proc.returncode:
-        errs = errs.decode("utf-8").strip()
+    _exists.cache_clear()
+    try:
+        proc = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            shell=shell,
+            timeout=timeout,
+            env=env,
+            encoding="utf-8",
+            errors="replace",
+        )
+        outs, errs, returncode = proc.stdout, proc.stderr, proc.returncode
+    except subprocess.TimeoutExpired as e:
+        # the process has been killed, report it as failed
+        outs, errs, returncode = e.stdout, e.stderr, -1
+        if isinstance(outs, bytes):
+            outs = outs.decode("utf-8", "replace")
+        if isinstance(errs, bytes):
+            errs = errs.decode("utf-8", "replace")
+
+    # stripped, or None; failures are told by the return code, not by
+    #  stderr (e.g. sudo's prompt or warnings), but always report something
+    outs = outs.strip() if outs else None
+    if returncode:
+        errs = (errs or "").strip() or f"exited with status {returncode}"
     else:
         errs = None
 
@@ -370,11 +604,82 @@ def run(cmd, shell=False, timeout=1):
     # print(cmd)
     # gray(outs)
     # red(errs)
-    # red("returncode: " + str(proc.returncode))
+    # red("returncode: " + str(returncode))
 
     return outs, errs
 
 
+class _SudoScript:
+    """
+    Accumulate privileged commands and run them in a single sudo session.
+
+    Commands are written to a temporary "set -eo pipefail" script which is
+    run with "sudo bash" (see _sudo()) once on exit, so that sudo (and its
+    credentials check) is invoked once instead of once per command. Errors
+    abort the script and are reported through red(), exiting.
+
+    No timeout by default: a timeout kills sudo but not the commands of the
+    script, which keep running in the background. Batches also wait for a
+    password prompt and copy whole install trees.
+    """
+
+    def __init__(self, description, timeout=None):  # noqa: D107
+        self.description = description
+        self.timeout = timeout
+        self._lines = ["set -eo pipefail"]
+
+    def add(self, *argv):
+        """Append a command, given as its argv, to the script."""
+        self.add_pipeline(argv)
+
+    def add_cleanup(self, *argv):
+        """
+        Run a command, given as its argv, whenever the script exits.
+
+        E.g. umount right after a mount, so that a failing step doesn't leave
+        the mount behind. Its errors are ignored, the script's exit status is
+        kept.
+        """
+        import shlex
+
+        command = " ".join(shlex.quote(arg) for arg in argv) + " 2>/dev/null"
+        self._lines.append("trap " + shlex.quote(command) + " EXIT")
+
+    def add_pipeline(self, *argvs):
+        """Append commands, each given as its argv, piped into each other."""
+        import shlex
+
+        self._lines.append(
+            " | ".join(" ".join(shlex.quote(arg) for arg in argv) for argv in argvs)
+        )
+
+    def flush(self):
+        """Run the accumulated commands, exit on error."""
+        if len(self._lines) == 1:
+            return
+        import tempfile
+
+        with tempfile.NamedTemporaryFile("w", suffix=".sh") as script:
+            script.write("\n".join(self._lines) + "\n")
+            script.flush()
+            outs, errs = run(_sudo("bash", script.name), timeout=self.timeout)
+        del self._lines[1:]
+        if errs:
+            red(
+                f"Something went wrong while {self.description}.\n"
+                f"Review the output: {errs}"
+            )
+            sys.exit(1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        return False
+
+
 def mount_rawimage(rawimage_path, partition=1, debug=False):
     """
     Mounts a disk image as provided by the parameter rawimage_path. Image is
@@ -404,111 +709,61 @@ def mount_rawimage(rawimage_path, partition=1, debug=False):
             + "the image."
         )
         sys.exit(1)
-    green("- Confirmed availability of raw image file at: " + rawimage_path)
-
-    # fetch UNITS
-    units = None
-    cmd = "fdisk -l " + rawimage_path + " | grep 'Units\\|Unidades' | awk '{print $8}'"
-    outs, errs = run(cmd, shell=True)
-    if outs:
-        units = int(outs)
+    green(f"- Confirmed availability of raw image file at: {rawimage_path}")
+
+    # fetch UNITS and STARTSECTORPn
+    units, startsectors, outs = get_rawimage_partitions(rawimage_path)
     if not units:
         red(
             "Something went wrong while fetching the raw image UNITS.\n"
-            + "Review the output: "
-            + outs
+            f"Review the output: {outs}"
         )
         sys.exit(1)
 
-    # fetch STARTSECTORPn
-    startsectorpn = None
-    sectorpn = "img" + str(partition)
-
-    # partitions will look like:
-    #
-    # Device       Boot   Start     End Sectors  Size Id Type
-    # sd_card.img1 *       2048 1148927 1146880  560M  c W95 FAT32 (LBA)
-    # sd_card.img2      1148928 6703103 5554176  2.7G 83 Linux
-
-    if partition == 1:
-        cmd = (
-            "fdisk -l "
-            + rawimage_path
-            + " | grep '"
-            + sectorpn
-            + "' | awk '{print $3}'"
-        )
-    else:
-        cmd = (
-            "fdisk -l "
-            + rawimage_path
-            + " | grep '"
-            + sectorpn
-            + "' | awk '{print $2}'"
-        )
-
+    startsectorpn = startsectors.get(partition)
     if debug:
-        print(cmd)
-
-    outs, errs = run(cmd, shell=True)
-    if outs:
-        startsectorpn = int(outs)
-        if debug:
-            print("startsectorpn: " + str(startsectorpn))
+        print("startsectorpn: " + str(startsectorpn))
 
     if not startsectorpn:
         red(
             "Something went wrong while fetching the raw image STARTSECTOR for partition: "
-            + str(partition)
-            + ".\n"
-            + "Review the output: "
-            + outs
+            f"{partition}.\n"
+            f"Review the output: {outs}"
         )
         sys.exit(1)
     green(
         "- Finished inspecting raw image, obtained UNITS and STARTSECTOR for partition: "
-        + str(partition)
-        + "."
+        f"{partition}."
     )
 
     # create mountpoint
     mountpointnth = mountpointn + str(partition)
-    cmd = "mkdir -p " + mountpointnth
-    outs, errs = run(cmd, shell=True)
-    if errs:
-        red(
-            "Something went wrong while setting MOUNTPOINT.\n"
-            + "Review the output: "
-            + errs
-        )
+    try:
+        os.makedirs(mountpointnth, exist_ok=True)
+    except OSError as e:
+        red(f"Something went wrong while setting MOUNTPOINT.\nReview the output: {e}")
         sys.exit(1)
 
     # mount pnth
-    cmd = (
-        "sudo mount -o loop,offset="
-        + str(units * startsectorpn)
-        + " "
-        + rawimage_path
-        + " "
-        + mountpointnth
+    cmd = _sudo(
+        "mount",
+        "-o",
+        "loop,offset=" + str(units * startsectorpn),
+        rawimage_path,
+        mountpointnth,
     )
 
     if debug:
-        print(cmd)
+        print(" ".join(cmd))
 
-    outs, errs = run(
-        cmd, shell=True, timeout=10
-    )  # longer timeout, allow user to input password
+    outs, errs = run(cmd, timeout=10)  # longer timeout, allow user to input password
     if errs:
         red(
-            "Something went wrong while mounting partition: "
-            + str(partition)
-            + ".\n"
-            + "Review the output: "
-            + errs
+            f"Something went wrong while mounting partition: {partition}.\n"
+            f"Review the output: {errs}"
         )
         sys.exit(1)
-    green("- Image mounted successfully at: " + mountpointnth)
+    green(f"- Image mounted successfully at: {mountpointnth}")
 
     return mountpointnth
 
@@ -523,30 +778,31 @@ def umount_rawimage(partition=None):
     # syncs and umount both partitions, regardless of what's mounted (oversimplification)
     toumount = "1 and 2"
     if partition:
-        cmd = "sync && sudo umount " + mountpointn + str(partition)
+        mountpoints = [mountpointn + str(partition)]
         toumount = str(partition)
     else:  # umount first and second by default
-        cmd = "sync && sudo umount " + mountpoint1 + " && sudo umount " + mountpoint2
-    outs, errs = run(cmd, shell=True, timeout=15)
+        mountpoints = [mountpoint1, mountpoint2]
+    os.sync()
+    for mountpoint in mountpoints:
+        outs, errs = run(_sudo("umount", mountpoint), timeout=15)
+        if errs:
+            break
     if errs:
         red(
             "Something went wrong while umounting the raw image partitions: "
-            + toumount
-            + ".\n"
-            + "Review the output: "
-            + errs
+            f"{toumount}.\n"
+            f"Review the output: {errs}"
         )
         sys.exit(1)
     green("- Umounted the raw image.")
 
 
-def replace_kernel(kernel_filename):
+def _deploy_kernel(kernel_filename, destination, action):
     """
-    Mount sd_card disk image in the workspace and replace kernel according
-    to argument kernel_filename.
+    Copy firmware kernel file kernel_filename into the first partition.
 
-    NOTE: Refer to get_sdcard_img_dir() function for the location of
-    the file
+    param: destination: file name within the mounted partition
+    param: action: verb reported once the kernel is in place
     """
     # # Add a security warning
     # yellow(
@@ -560,22 +816,32 @@ def replace_kernel(kernel_filename):
 
     # check that target kernel exists
     kernel_filename_path = firmware_dir + "/kernel/" + kernel_filename
-    if not os.path.exists(kernel_filename_path):
-        red("kernel file " + kernel_filename_path + " not found.")
+    if not _exists(kernel_filename_path):
+        red(f"kernel file {kernel_filename_path} not found.")
         sys.exit(1)
-    green("- Found kernel file " + kernel_filename_path)
+    green(f"- Found kernel file {kernel_filename_path}")
 
     # copy the corresponding kernel file
-    cmd = "sudo cp " + kernel_filename_path + " " + mountpoint1 + "/Image"
-    outs, errs = run(cmd, shell=True, timeout=15)
+    cmd = _sudo("cp", kernel_filename_path, mountpoint1 + "/" + destination)
+    outs, errs = run(cmd, timeout=15)
     if errs:
         red(
             "Something went wrong while replacig the kernel.\n"
-            + "Review the output: "
-            + errs
+            f"Review the output: {errs}"
         )
         sys.exit(1)
-    green("- Kernel deployed successfully (" + kernel_filename_path + ").")
+    green(f"- Kernel {action} successfully ({kernel_filename_path}).")
+
+
+def replace_kernel(kernel_filename):
+    """
+    Mount sd_card disk image in the workspace and replace kernel according
+    to argument kernel_filename.
+
+    NOTE: Refer to get_sdcard_img_dir() function for the location of
+    the file
+    """
+    _deploy_kernel(kernel_filename, "Image", "deployed")
 
 
 def add_kernel(kernel_filename):
@@ -590,34 +856,7 @@ def add_kernel(kernel_filename):
     NOTE 2: Refer to get_sdcard_img_dir() function for the location of
     the file
     """
-    # # Add a security warning
-    # yellow(
-    #     "SECURITY WARNING: This class invokes explicitly a shell via the "
-    #     "shell=True argument of the Python subprocess library, and uses "
-    #     "admin privileges to manage raw disk images. It is the user's "
-    #     "responsibility to ensure that all whitespace and metacharacters "
-    #     "passed are quoted appropriately to avoid shell injection vulnerabilities."
-    # )
-    firmware_dir = get_firmware_dir()
-
-    # check that target kernel exists
-    kernel_filename_path = firmware_dir + "/kernel/" + kernel_filename
-    if not os.path.exists(kernel_filename_path):
-        red("kernel file " + kernel_filename_path + " not found.")
-        sys.exit(1)
-    green("- Found kernel file " + kernel_filename_path)
-
-    # copy the corresponding kernel file
-    cmd = "sudo cp " + kernel_filename_path + " " + mountpoint1 + "/" + kernel_filename
-    outs, errs = run(cmd, shell=True, timeout=15)
-    if errs:
-        red(
-            "Something went wrong while replacig the kernel.\n"
-            + "Review the output: "
-            + errs
-        )
-        sys.exit(1)
-    green("- Kernel added successfully (" + kernel_filename_path + ").")
+    _deploy_kernel(kernel_filename, kernel_filename, "added")
 
 
 def exists(file_path):
@@ -627,6 +866,7 @@ def exists(file_path):
     param file_path: absolute path of the file
     return: bool
     """
+    # not memoized, callers probe files they (or the tools they run) create
     if os.path.exists(file_path):
         return True
     else:
@@ -653,15 +893,20 @@ def copy_colcon_workspace(install_dir):  # noqa: D102
     #########################
     if not check_install_directory(install_dir):
         red(
-            "workspace "
-            + install_dir
-            + " directory not found. Consider running "
-            + "this command from the root directory of the workspace and build "
-            + "the workspace first"
+            f"workspace {install_dir} directory not found. Consider running "
+            "this command from the root directory of the workspace and build "
+            "the workspace first"
         )
         sys.exit(1)
     green("- Verified that install/ is available in the current colcon workspace")
 
+    # resolve the environment once, before touching the raw image
+    ros_distro = os.environ.get("ROS_DISTRO")
+    if not ros_distro:
+        red("ROS_DISTRO not set. Consider sourcing your ROS 2 installation first.")
+        sys.exit(1)
+    workspace_dir = get_workspace_dir()
+
     #########################
     # 2. mounts the embedded raw image ("sd_card.img" file) available in deployed firmware
     #     and deploys the `<workspace>/install/` directory under "/<workspace-name>"
@@ -678,186 +923,79 @@ def copy_colcon_workspace(install_dir):  # noqa: D102
             + "the image."
         )
         sys.exit(1)
-    green("- Confirmed availability of raw image file at: " + rawimage_path)
-
-    # fetch UNITS
-    units = None
-    cmd = "fdisk -l " + rawimage_path + " | grep 'Units\\|Unidades' | awk '{print $8}'"
-    outs, errs = run(cmd, shell=True)
-    if outs:
-        units = int(outs)
+    green(f"- Confirmed availability of raw image file at: {rawimage_path}")
+
+    # define mountpoint
+    mountpoint = "/tmp/sdcard_img_p2"
+    try:
+        os.makedirs(mountpoint, exist_ok=True)
+    except OSError as e:
+        red(f"Something went wrong while setting MOUNTPOINT.\nReview the output: {e}")
+        sys.exit(1)
+    workspace_path = mountpoint + "/" + workspace_dir
+    # Create setup.bash to copy to mountpoint in target_dir
+    script_path = create_ros2_overlay_script(workspace_dir)
+    target_dir_embedded = "/opt/ros/" + ros_distro + "/"
+    target_dir = mountpoint + target_dir_embedded
+
+    # fetch UNITS, STARTSECTORP1 and STARTSECTORP2
+    units, startsectors, outs = get_rawimage_partitions(rawimage_path)
     if not units:
         red(
             "Something went wrong while fetching the raw image UNITS.\n"
-            + "Review the output: "
-            + outs
+            f"Review the output: {outs}"
         )
         sys.exit(1)
 
-    # fetch STARTSECTORP1
-    startsectorp1 = None
-    cmd = "fdisk -l " + rawimage_path + " | grep 'img1' | awk '{print $3}'"
-    outs, errs = run(cmd, shell=True)
-    if outs:
-        startsectorp1 = int(outs)
+    startsectorp1 = startsectors.get(1)
     if not startsectorp1:
         red(
             "Something went wrong while fetching the raw image STARTSECTORP1.\n"
-            + "Review the output: "
-            + outs
+            f"Review the output: {outs}"
         )
         sys.exit(1)
 
-    # fetch STARTSECTORP2
-    startsectorp2 = None
-    cmd = "fdisk -l " + rawimage_path + " | grep 'img2' | awk '{print $2}'"
-    outs, errs = run(cmd, shell=True)
-    if outs:
-        startsectorp2 = int(outs)
+    startsectorp2 = startsectors.get(2)
     if not startsectorp2:
         red(
             "Something went wrong while fetching the raw image STARTSECTORP2.\n"
-            + "Review the output: "
-            + outs
-            if outs
-            else "None"
+            f"Review the output: {outs}"
         )
         sys.exit(1)
     green("- Finished inspecting raw image, obtained UNITS and STARTSECTOR P1/P2")
 
-    # define mountpoint and mount
-    mountpoint = "/tmp/sdcard_img_p2"
-    cmd = "mkdir -p " + mountpoint
-    outs, errs = run(cmd, shell=True)
-    if errs:
-        red(
-            "Something went wrong while setting MOUNTPOINT.\n"
-            + "Review the output: "
-            + errs
-        )
-        sys.exit(1)
-    cmd = (
-        "sudo mount -o loop,offset="
-        + str(units * startsectorp2)
-        + " "
-        + rawimage_path
-        + " "
-        + mountpoint
-    )
-
-    # # debug
-    # print(cmd)
-
-    outs, errs = run(
-        cmd, shell=True, timeout=15
-    )  # longer timeout, allow user to input password
-    if errs:
-        red("Something went wrong while mounting.\n" + "Review the output: " + errs)
-        sys.exit(1)
-    green("- Image mounted successfully at: " + mountpoint)
-
-    workspace_dir = get_workspace_dir()
-    # remove prior overlay colcon workspace files at "/<workspace_dir>",
-    #  and copy the <ws>/<install_dir> directory as such
-    if os.path.exists(mountpoint + "/" + workspace_dir):
-        cmd = "sudo rm -r " + mountpoint + "/" + workspace_dir + "/*"
-        outs, errs = run(cmd, shell=True)
-        if errs:
-            red(
-                "Something went wrong while removing image workspace.\n"
-                + "Review the output: "
-                + errs
-            )
-            sys.exit(1)
-        green(
-            "- Successfully cleaned up prior overlay colcon workspace "
-            + "at: "
-            + mountpoint
-            + "/"
-            + workspace_dir
-        )
-    else:
-        yellow(
-            "No prior overlay colcon workspace found "
-            + "at: "
-            + mountpoint
-            + "/"
-            + workspace_dir
-            + ", creating it."
-        )
-        cmd = "sudo mkdir " + mountpoint + "/" + workspace_dir
-        outs, errs = run(cmd, shell=True)
-        if errs:
-            red(
-                "Something went wrong while creating overlay colcon workspace.\n"
-                + "Review the output: "
-                + errs
-            )
-            sys.exit(1)
-
-    cmd = "sudo cp -r " + install_dir + "/* " + mountpoint + "/" + workspace_dir
-    outs, errs = run(cmd, shell=True)
-    if errs:
-        red(
-            "Something went wrong while copying overlay colcon workspace to mountpoint.\n"
-            + "Review the output: "
-            + errs
+    # mount, copy and umount within a single privileged session
+    with _SudoScript("copying overlay colcon workspace to the raw image") as script:
+        script.add(
+            "mount",
+            "-o",
+            "loop,offset=" + str(units * startsectorp2),
+            rawimage_path,
+            mountpoint,
         )
-        sys.exit(1)
+        script.add_cleanup("umount", mountpoint)
+        # remove prior overlay colcon workspace files at "/<workspace_dir>",
+        #  and copy the <ws>/<install_dir> directory as such
+        script.add("mkdir", "-p", workspace_path)
+        script.add("find", workspace_path, "-mindepth", "1", "-delete")
+        # -T copies the contents of install_dir, no shell glob required;
+        #  file data is cloned (CoW filesystems) or copied in-kernel
+        #  (copy_file_range) instead of through user space
+        script.add("cp", "-rT", "--reflink=auto", install_dir, workspace_path)
+        script.add("mkdir", "-p", target_dir)
+        script.add("cp", script_path, target_dir)
+        #########################
+        # 3. syncs and umount the raw image
+        #########################
+        script.add("sync")
+        script.add("umount", mountpoint)
+
+    green(f"- Mounted, updated and umounted the raw image at: {mountpoint}")
     green(
-        "- Copied '"
-        + install_dir
-        + "' directory as a colcon overlay workspace in the raw image "
-        + " at location "
-        + "/"
-        + workspace_dir
+        f"- Replaced the overlay colcon workspace with '{install_dir}' in the raw "
+        f"image, at location /{workspace_dir}"
     )
-
-    # Create setup.bash and copy to mountpoint in target_dir
-    script_path = create_ros2_overlay_script()
-    target_dir_embedded = "/opt/ros/" + os.getenv("ROS_DISTRO") + "/"
-    target_dir = mountpoint + target_dir_embedded
-
-    cmd = "sudo mkdir -p " + target_dir
-    outs, errs = run(cmd, shell=True)
-    if errs:
-        red(
-            "Something went wrong while creating "
-            + target_dir
-            + ".\n"
-            + "Review the output: "
-            + errs
-        )
-        sys.exit(1)
-
-    cmd = "sudo cp " + script_path + " " + target_dir
-    outs, errs = run(cmd, shell=True)
-    if errs:
-        red(
-            "Something went wrong while copying "
-            + script_path
-            + " to "
-            + target_dir
-            + ".\n"
-            + "Review the output: "
-            + errs
-        )
-        sys.exit(1)
-    green("- Created and copied in rootfs " + target_dir_embedded + "setup.bash.")
-
-    #########################
-    # 3. syncs and umount the raw image
-    #########################
-    cmd = "sync && sudo umount " + mountpoint
-    outs, errs = run(cmd, shell=True, timeout=15)
-    if errs:
-        red(
-            "Something went wrong while umounting the raw image.\n"
-            + "Review the output: "
-            + errs
-        )
-        sys.exit(1)
-    green("- Umounted the raw image.")
+    green(f"- Created and copied in rootfs {target_dir_embedded}setup.bash.")
 
 
 def copy_libstdcppfs(partition=2):  # noqa: D102
@@ -871,47 +1009,58 @@ def copy_libstdcppfs(partition=2):  # noqa: D102
     mount_rawimage(rawimage_path, partition)
 
     firmware_dir = get_firmware_dir()
-    cmd = (
-        "sudo cp -r "
-        + firmware_dir
-        + "/lib/libstdc++fs.a "
-        + mountpointn
-        + str(partition)
-        + "/usr/lib/libstdc++fs.a"
+    cmd = _sudo(
+        "cp",
+        "-r",
+        firmware_dir + "/lib/libstdc++fs.a",
+        mountpointn + str(partition) + "/usr/lib/libstdc++fs.a",
     )
-    outs, errs = run(cmd, shell=True)
+    outs, errs = run(cmd)
 
     # umount raw disk image
     umount_rawimage(partition)
 
 
-def create_ros2_overlay_script():  # noqa: D102
-    """
-    Creates common /opt/ros/<ROS distro>/setup.bash script on the go
-
-    return: path to the script just created under /tmp (/tmp/setup.bash)
-    """
-    workspace_dir = get_workspace_dir()
-    script_path = "/tmp/setup.bash"
-
-    content = """
+# /opt/ros/<ROS distro>/setup.bash, formatted with the workspace name
+_SETUP_BASH_TEMPLATE = b"""
 AMENT_SHELL=bash
 
 # source colcon installation in Yocto-based rootfs
 source /usr/bin/ros_setup.bash
 
 # source colcon overlay workspace
+source /%s/local_setup.bash
+AMENT_PREFIX_PATH="/usr:$AMENT_PREFIX_PATH"
 """
-    content += "source /" + workspace_dir + "/local_setup.bash\n"
-    content += 'AMENT_PREFIX_PATH="/usr:$AMENT_PREFIX_PATH"\n'
 
-    script = open(script_path, "w")
-    script.truncate(0)  # delete previous content
-    script.write(content)
-    script.close()
 
+def create_ros2_overlay_script(workspace_dir=None):  # noqa: D102
+    """
+    Creates common /opt/ros/<ROS distro>/setup.bash script on the go
+
+    param: workspace_dir: name of the colcon workspace, defaults to the current one
+    return: path to the script just created under /tmp (/tmp/setup.bash)
+    """
+    if workspace_dir is None:
+        workspace_dir = get_workspace_dir()
+    script_path = "/tmp/setup.bash"
+    _write_file(script_path, _SETUP_BASH_TEMPLATE % workspace_dir.encode())
     return script_path
 
+
+def _write_file(path, data):
+    """
+    Write bytes data to path with a single write, replacing any content.
+
+    O_TRUNC drops the previous content as part of the open() call.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
 def fix_yocto_honister(partition=2):  # noqa: D102
     """Fixes ROS 2 Humble setup in Yocto (Honister release)
 
@@ -1085,33 +1234,30 @@ fi
 
     rawimage_path = get_rawimage_path("sd_card.img")
     mountpoint = mount_rawimage(rawimage_path, partition)
-    mountpoint_tmp = "/tmp"
-    path_script_etc_profile_tmp = mountpoint_tmp + "/setup.sh"
-    path_script_usr_bin_tmp = mountpoint_tmp + "/ros_setup.bash"
-    path_script_etc_profile = mountpoint + "/etc/profile.d/ros/setup.sh"
-    path_script_usr_bin = mountpoint + "/usr/bin/ros_setup.bash"
-
-    # Write both scripts in /tmp
-    script_etc_profile = open(path_script_etc_profile_tmp, "w")
-    script_etc_profile.truncate(0)  # delete previous content
-    script_etc_profile.write(content_etc_profile)
-    script_etc_profile.close()
-
-    script_usr_bin = open(path_script_usr_bin_tmp, "w")
-    script_usr_bin.truncate(0)  # delete previous content
-    script_usr_bin.write(content_usr_bin)
-    script_usr_bin.close()
-
-    # Move files to new paths
-    outs, errs = run(
-        "sudo mkdir -p " + mountpoint + "/etc/profile.d/ros",
-        shell=True)
-    outs, errs = run(
-        "sudo mv " + path_script_etc_profile_tmp + " " + path_script_etc_profile,
-        shell=True)
-    outs, errs = run(
-        "sudo mv " + path_script_usr_bin_tmp + " " + path_script_usr_bin,
-        shell=True)
+
+    # extract both scripts into the rootfs with a single (privileged) tar,
+    #  instead of writing /tmp copies and moving them one by one
+    import io
+    import tarfile
+    import tempfile
+    import time
+
+    with tempfile.NamedTemporaryFile(suffix=".tar") as archive:
+        with tarfile.open(fileobj=archive, mode="w") as tar:
+            for path, content in (
+                ("etc/profile.d/ros/setup.sh", content_etc_profile),
+                ("usr/bin/ros_setup.bash", content_usr_bin),
+            ):
+                data = content.encode()
+                info = tarfile.TarInfo(path)
+                info.size = len(data)
+                info.mode = 0o644
+                info.mtime = time.time()
+                tar.addfile(info, io.BytesIO(data))
+        archive.flush()
+        outs, errs = run(_sudo("tar", "-xf", archive.name, "-C", mountpoint))
+    if errs:
+        red(f"Something went wrong while copying the ROS 2 setup scripts.\n{errs}")
 
     # umount raw disk image
     umount_rawimage(partition)
@@ -2,23 +2,168 @@
 # Licensed under the Apache License, Version 2.0
 
 import os
+import shutil
 import sys
 
-from colcon_core.plugin_system import satisfies_version
+from colcon_core.logging import colcon_logger
 from colcon_hardware_acceleration.subverb import (
     AccelerationSubverbExtensionPoint,
     check_install_directory,
     get_rawimage_path,
-    run,
+    get_rawimage_partitions,
     get_install_dir,
     get_firmware_dir,
     get_vitis_dir,
     get_vivado_dir,
     get_workspace_dir,
     create_ros2_overlay_script,
+    _SudoScript,
 )
 from colcon_hardware_acceleration.verb import green, yellow, red
 
+logger = colcon_logger.getChild(__name__)
+
+# emulation arguments files, formatted with the emulation files directory (d)
+_PMU_ARGS_TEMPLATE = """\
+-M
+microblaze-fdt
+-device
+loader,file={d}/../pmufw.elf
+-machine-path
+.
+-display
+none
+"""
+
+# default dev. board, the ZCU102
+_QEMU_ARGS_TEMPLATE = """\
+-M
+arm-generic-fdt
+-serial
+mon:stdio
+-global
+xlnx,zynqmp-boot.cpu-num=0
+-global
+xlnx,zynqmp-boot.use-pmufw=true
+-net
+nic
+-net
+nic
+-net
+nic
+-net
+nic
+-net
+user,hostfwd=tcp:127.0.0.1:2222-10.0.2.15:22
+-m
+4G
+-device
+loader,file={d}/../bl31.elf,cpu-num=0
+-device
+loader,file={d}/../u-boot.elf
+-boot
+mode=5
+"""
+
+# KV260, formerly also loading:
+#  -device loader,file={d}/../ramdisk.cpio.gz.u-boot,addr=0x04000000,force-raw
+#  -device loader,file={d}/../kernel/Image,addr=0x00200000,force-raw
+#  -net nic -net nic -net nic -net nic,netdev=eth0 -netdev user,id=eth0,tftp=/tftpboot
+_QEMU_KV260_ARGS_TEMPLATE = """\
+-M arm-generic-fdt
+-serial /dev/null -serial mon:stdio -display none
+-device loader,file={d}/../bl31.elf,cpu-num=0
+-device loader,file={d}/../u-boot.elf
+-device loader,file={d}/../device_tree/u-boot.dtb,addr=0x00100000,force-raw
+-gdb tcp::9000
+-net nic -net nic -net nic -net nic -net user,hostfwd=tcp:127.0.0.1:2222-10.0.2.15:22
+-hw-dtb {d}/../zynqmp-qemu-multiarch-arm.dtb
+-global xlnx,zynqmp-boot.cpu-num=0 -global xlnx,zynqmp-boot.use-pmufw=true
+-m 4G
+"""
+
+
+def _create_file(path, template, emulation_files_dir):
+    """
+    Write template, formatted with emulation_files_dir, to path unless path
+    already exists.
+
+    O_EXCL checks and creates the file in a single open() call, existing
+    files (possibly edited by the user) are left untouched and the template
+    is only formatted for new ones.
+    """
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return
+    try:
+        os.write(fd, template.format(d=emulation_files_dir).encode())
+    finally:
+        os.close(fd)
+
+
+def _loop_mount_source(mountpoint):
+    """
+    Get the backing file and offset of the loop device mounted at mountpoint.
+
+    Looks the mount up in /proc/self/mountinfo (the last entry wins, it's
+    the one on top) and its loop device in /sys/block.
+
+    :rtype: Tuple, or None if mountpoint isn't mounted from a loop device
+    """
+    source = None
+    try:
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                # <id> <parent> <dev> <root> <mountpoint> ... - <fs> <source> ...
+                fields = line.split()
+                if fields[4] == mountpoint:
+                    source = fields[fields.index("-") + 2]
+        if not source or not source.startswith("/dev/loop"):
+            return None
+        loop_dir = "/sys/block/" + os.path.basename(source) + "/loop/"
+        with open(loop_dir + "backing_file") as f:
+            backing_file = f.read().strip()
+        with open(loop_dir + "offset") as f:
+            offset = int(f.read())
+    except (OSError, ValueError, IndexError):
+        return None
+    return backing_file, offset
+
+
+def _emulator_argv(context, emulation_file_qemu, emulation_file_pmu):
+    """
+    Get the launch_emulator command line shared by sw_emu and hw_emu.
+
+    :rtype: List
+    """
+    return [
+        get_vitis_dir() + "/bin/launch_emulator",
+        "-device-family",
+        "ultrascale",
+        "-target",
+        context.args.emulation_type,
+        "-qemu-args-file",
+        emulation_file_qemu,
+        "-pmc-args-file",
+        emulation_file_pmu,
+    ]
+
+
+def _launch_emulator(argv, cwd, env=None):
+    """
+    Run launch_emulator in the foreground, without a shell.
+
+    :param argv: launch_emulator command split in the form of a list
+    :param cwd: directory to run it from, the emulation files directory
+    :param env: environment of the process, defaults to the current one
+    """
+    # imported here, as in run()
+    import subprocess
+
+    logger.debug("Launching the emulator in '%s': %s", cwd, " ".join(argv))
+    subprocess.run(argv, cwd=cwd, env=env)
+
 
 class EmulationSubverb(AccelerationSubverbExtensionPoint):
     """Manage emulation capabilities.
@@ -35,17 +180,10 @@ class EmulationSubverb(AccelerationSubverbExtensionPoint):
     NOTE: The install/ directory in the workspace will be copied to
         "/<workspace-name>" in the image.
 
-    NOTE 2: This class invokes explicitly a shell via shell=True of the Python subprocess library and uses admin,
-    privileges to manage raw disk images. Tt is the user's responsibility to ensure that all whitespace and
-    metacharacters passed are quoted appropriately to avoid shell injection vulnerabilities.
+    NOTE 2: This class uses admin privileges to manage raw disk images. Commands are
+    run without a shell, their arguments are quoted when batched into a sudo script.
     """
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(
-            AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0"
-        )
-
     def add_arguments(self, *, parser):  # noqa: D102
         parser.description += (
             "\n\n"
@@ -106,21 +244,7 @@ class EmulationSubverb(AccelerationSubverbExtensionPoint):
         :param: emulation_files_dir: path to the emulation files directory
         :param: emulation_file_pmu: path of the file to create
         """
-
-        if not os.path.exists(emulation_file_pmu):
-            file_str = "-M" + "\n"
-            file_str += "microblaze-fdt" + "\n"
-            file_str += "-device" + "\n"
-            file_str += "loader,file=" + emulation_files_dir + "/../pmufw.elf" + "\n"
-            file_str += "-machine-path" + "\n"
-            file_str += "." + "\n"
-            file_str += "-display" + "\n"
-            file_str += "none" + "\n"
-
-            f = open(emulation_file_pmu, "w")
-            f.truncate(0)  # delete previous content
-            f.write(file_str)
-            f.close()
+        _create_file(emulation_file_pmu, _PMU_ARGS_TEMPLATE, emulation_files_dir)
 
     def gen_qemufile(self, emulation_files_dir, emulation_file_qemu):
         """
@@ -135,40 +259,7 @@ class EmulationSubverb(AccelerationSubverbExtensionPoint):
         :param: emulation_files_dir: path to the emulation files directory
         :param: emulation_file_qemu: path of the file to create
         """
-        if not os.path.exists(emulation_file_qemu):
-            file_str = "-M" + "\n"
-            file_str += "arm-generic-fdt" + "\n"
-            file_str += "-serial" + "\n"
-            file_str += "mon:stdio" + "\n"
-            file_str += "-global" + "\n"
-            file_str += "xlnx,zynqmp-boot.cpu-num=0" + "\n"
-            file_str += "-global" + "\n"
-            file_str += "xlnx,zynqmp-boot.use-pmufw=true" + "\n"
-            file_str += "-net" + "\n"
-            file_str += "nic" + "\n"
-            file_str += "-net" + "\n"
-            file_str += "nic" + "\n"
-            file_str += "-net" + "\n"
-            file_str += "nic" + "\n"
-            file_str += "-net" + "\n"
-            file_str += "nic" + "\n"
-            file_str += "-net" + "\n"
-            file_str += "user,hostfwd=tcp:127.0.0.1:2222-10.0.2.15:22" + "\n"
-            file_str += "-m" + "\n"
-            file_str += "4G" + "\n"
-            file_str += "-device" + "\n"
-            file_str += (
-                "loader,file=" + emulation_files_dir + "/../bl31.elf,cpu-num=0" + "\n"
-            )
-            file_str += "-device" + "\n"
-            file_str += "loader,file=" + emulation_files_dir + "/../u-boot.elf" + "\n"
-            file_str += "-boot" + "\n"
-            file_str += "mode=5" + "\n"
-
-            f = open(emulation_file_qemu, "w")
-            f.truncate(0)  # delete previous content
-            f.write(file_str)
-            f.close()
+        _create_file(emulation_file_qemu, _QEMU_ARGS_TEMPLATE, emulation_files_dir)
 
     def gen_qemufile_kv260(self, emulation_files_dir, emulation_file_qemu):
         """
@@ -181,49 +272,151 @@ class EmulationSubverb(AccelerationSubverbExtensionPoint):
         :param: emulation_files_dir: path to the emulation files directory
         :param: emulation_file_qemu: path of the file to create
         """
-        if not os.path.exists(emulation_file_qemu):
-
-            file_str = "-M arm-generic-fdt\n"
-            file_str += "-serial /dev/null -serial mon:stdio -display none" + "\n"
-            file_str += (
-                "-device loader,file="
-                + emulation_files_dir
-                + "/../bl31.elf,cpu-num=0"
-                + "\n"
+        _create_file(
+            emulation_file_qemu, _QEMU_KV260_ARGS_TEMPLATE, emulation_files_dir
+        )
+
+    def deploy_install_dir(
+        self, rawimage_path, install_dir, install_dir_input, workspace_dir
+    ):
+        """
+        Copy the install directory into p2 of the raw image, as "/<workspace_dir>"
+
+        param: rawimage_path: path of the raw image
+        param: install_dir: path of the install directory to deploy
+        param: install_dir_input: install directory, as given by the user
+        param: workspace_dir: name of the colcon workspace
+        """
+        # fetch UNITS, STARTSECTORP1 and STARTSECTORP2
+        units, startsectors, outs = get_rawimage_partitions(rawimage_path)
+        if not units:
+            red(
+                "Something went wrong while fetching the raw image UNITS.\n"
+                + "Review the output: "
+                + str(outs)
             )
-            # file_str += "-device loader,file=" + emulation_files_dir + "/../ramdisk.cpio.gz.u-boot,addr=0x04000000,force-raw" + "\n"
-            file_str += (
-                "-device loader,file=" + emulation_files_dir + "/../u-boot.elf" + "\n"
+            sys.exit(1)
+
+        startsectorp1 = startsectors.get(1)
+        if not startsectorp1:
+            red(
+                "Something went wrong while fetching the raw image STARTSECTORP1.\n"
+                + "Review the output: "
+                + str(outs)
             )
-            # file_str += "-device loader,file=" + emulation_files_dir + "/../kernel/Image,addr=0x00200000,force-raw" + "\n"
-            file_str += (
-                "-device loader,file="
-                + emulation_files_dir
-                + "/../device_tree/u-boot.dtb,addr=0x00100000,force-raw"
-                + "\n"
+            sys.exit(1)
+
+        startsectorp2 = startsectors.get(2)
+        if not startsectorp2:
+            red(
+                "Something went wrong while fetching the raw image STARTSECTORP2.\n"
+                + "Review the output: "
+                + str(outs)
             )
-            file_str += "-gdb tcp::9000" + "\n"
-            # file_str += "-net nic -net nic -net nic -net nic,netdev=eth0 -netdev user,id=eth0,tftp=/tftpboot" + "\n"
-            file_str += (
-                "-net nic -net nic -net nic -net nic -net user,hostfwd=tcp:127.0.0.1:2222-10.0.2.15:22"
-                + "\n"
+            sys.exit(1)
+        green("- Finished inspecting raw image, obtained UNITS and STARTSECTOR P1/P2")
+
+        # define mountpoint
+        mountpoint = "/tmp/sdcard_img_p2"
+        # p2 of this raw image already mounted (e.g. with "colcon acceleration
+        #  mount"), deploy into it as is and umount it afterwards: the emulator
+        #  writes to the raw image, which must not stay mounted while it boots.
+        #  Anything else mounted there (another image, a stale mount) is left
+        #  alone.
+        mounted = os.path.ismount(mountpoint)
+        if mounted and _loop_mount_source(mountpoint) != (
+            os.path.realpath(rawimage_path),
+            units * startsectorp2,
+        ):
+            red(
+                mountpoint
+                + " is mounted, but not from partition 2 of "
+                + rawimage_path
+                + ".\nUmount it first, e.g. with 'colcon acceleration umount'."
             )
-            file_str += (
-                "-hw-dtb "
-                + emulation_files_dir
-                + "/../zynqmp-qemu-multiarch-arm.dtb"
-                + "\n"
+            sys.exit(1)
+        if mounted:
+            yellow(
+                "- The raw image is already mounted at: "
+                + mountpoint
+                + ", it will be umounted before booting the emulator."
             )
-            file_str += (
-                "-global xlnx,zynqmp-boot.cpu-num=0 -global xlnx,zynqmp-boot.use-pmufw=true"
-                + "\n"
+
+        try:
+            os.makedirs(mountpoint, exist_ok=True)
+        except OSError as e:
+            red(
+                "Something went wrong while setting MOUNTPOINT.\n"
+                + "Review the output: "
+                + str(e)
             )
-            file_str += "-m 4G" + "\n"
+            sys.exit(1)
 
-            f = open(emulation_file_qemu, "w")
-            f.truncate(0)  # delete previous content
-            f.write(file_str)
-            f.close()
+        workspace_path = mountpoint + "/" + workspace_dir
+        # Create setup.bash to copy to mountpoint in target_dir
+        script_path = create_ros2_overlay_script(workspace_dir)
+        target_dir_embedded = "/opt/ros/foxy/"
+        target_dir = mountpoint + target_dir_embedded
+
+        # mount, copy and umount within a single privileged session
+        #  (no timeout, allow user to input password)
+        #
+        # NOTE: the loop device is set up by mount and released by umount on
+        #  purpose. Keeping it attached across runs would save little (a
+        #  couple of ioctls) but leak loop devices on interrupted runs, and
+        #  the emulator writes to the same raw image.
+        with _SudoScript("copying overlay colcon workspace to the raw image") as script:
+            if not mounted:
+                script.add(
+                    "mount",
+                    "-o",
+                    "loop,offset=" + str(units * startsectorp2),
+                    rawimage_path,
+                    mountpoint,
+                )
+                # don't leave our own mount behind if a step below fails
+                script.add_cleanup("umount", mountpoint)
+            # replace prior overlay colcon workspace files at "/<workspace_dir>"
+            #  with the <ws>/install directory
+            script.add("mkdir", "-p", workspace_path)
+            if shutil.which("rsync"):
+                # only transfers the files that changed since the last copy
+                #  (size and mtime, preserved by -t), removing stale ones;
+                #  -rlptD is -a without -og, files stay owned by root as with cp
+                script.add(
+                    "rsync", "-rlptD", "--delete", install_dir + "/", workspace_path
+                )
+            else:
+                script.add("find", workspace_path, "-mindepth", "1", "-delete")
+                # -T copies the contents of install_dir, no shell glob required;
+                #  files can't be hard linked instead (cp -al), install_dir and
+                #  the loop mounted image are never the same filesystem
+                script.add("cp", "-rT", install_dir, workspace_path)
+            # -D creates target_dir as needed, a single process for both
+            script.add(
+                "install", "-D", "-m", "644", script_path, target_dir + "setup.bash"
+            )
+            #########################
+            # 3. syncs and umount the raw image
+            #########################
+            # umount writes back the partition (and detaches the loop device)
+            #  before returning, no need for a system-wide sync
+            script.add("umount", mountpoint)
+
+        if mounted:
+            green("- Updated and umounted the raw image at: " + mountpoint)
+        else:
+            green("- Mounted, updated and umounted the raw image at: " + mountpoint)
+        green(
+            "- Replaced the ROS 2 overlay workspace with '"
+            + install_dir_input
+            + "' in the raw image, at location: /"
+            + workspace_dir
+            + "."
+        )
+        green(
+            "- Created and copied in rootfs " + target_dir_embedded + "setup.bash."
+        )
 
     def prepare_emulation(self, context):  # noqa: D102
         """
@@ -234,10 +427,7 @@ class EmulationSubverb(AccelerationSubverbExtensionPoint):
         """
         # Add a security warning
         yellow(
-            "SECURITY WARNING: This class invokes explicitly a shell via the shell=True argument of the Python"
-            " subprocess library, and uses admin privileges to manage raw disk images. It is the user's "
-            "responsibility to ensure that all whitespace and metacharacters passed are quoted appropriately"
-            " to avoid shell injection vulnerabilities."
+            "SECURITY WARNING: This class uses admin privileges to manage raw disk images."
         )
 
         #########################
@@ -271,210 +461,25 @@ class EmulationSubverb(AccelerationSubverbExtensionPoint):
         # TODO: make setup.bash distro-agnostic
         #########################
         if not context.args.no_install:
-            # fetch UNITS
-            units = None
-            cmd = (
-                "fdisk -l "
-                + rawimage_path
-                + " | grep 'Units\\|Unidades' | awk '{print $8}'"
-            )
-            outs, errs = run(cmd, shell=True)
-            if outs:
-                units = int(outs)
-            if not units:
-                red(
-                    "Something went wrong while fetching the raw image UNITS.\n"
-                    + "Review the output: "
-                    + outs
-                )
-                sys.exit(1)
-
-            # fetch STARTSECTORP1
-            startsectorp1 = None
-            cmd = "fdisk -l " + rawimage_path + " | grep 'img1' | awk '{print $3}'"
-            outs, errs = run(cmd, shell=True)
-            if outs:
-                startsectorp1 = int(outs)
-            if not startsectorp1:
-                red(
-                    "Something went wrong while fetching the raw image STARTSECTORP1.\n"
-                    + "Review the output: "
-                    + outs
-                )
-                sys.exit(1)
-
-            # fetch STARTSECTORP2
-            startsectorp2 = None
-            cmd = "fdisk -l " + rawimage_path + " | grep 'img2' | awk '{print $2}'"
-            outs, errs = run(cmd, shell=True)
-            if outs:
-                startsectorp2 = int(outs)
-            if not startsectorp2:
-                red(
-                    "Something went wrong while fetching the raw image STARTSECTORP2.\n"
-                    + "Review the output: "
-                    + outs
-                    if outs
-                    else "None"
-                )
-                sys.exit(1)
-            green(
-                "- Finished inspecting raw image, obtained UNITS and STARTSECTOR P1/P2"
-            )
-
-            # define mountpoint and mount
-            mountpoint = "/tmp/sdcard_img_p2"
-            cmd = "mkdir -p " + mountpoint
-            outs, errs = run(cmd, shell=True)
-            if errs:
-                red(
-                    "Something went wrong while setting MOUNTPOINT.\n"
-                    + "Review the output: "
-                    + errs
-                )
-                sys.exit(1)
-            cmd = (
-                "sudo mount -o loop,offset="
-                + str(units * startsectorp2)
-                + " "
-                + rawimage_path
-                + " "
-                + mountpoint
+            self.deploy_install_dir(
+                rawimage_path,
+                get_install_dir(context.args.install_dir),
+                context.args.install_dir,
+                get_workspace_dir(),
             )
 
-            # # debug
-            # print(cmd)
-
-            outs, errs = run(
-                cmd, shell=True, timeout=15
-            )  # longer timeout, allow user to input password
-            if errs:
-                red(
-                    "Something went wrong while mounting.\n"
-                    + "Review the output: "
-                    + errs
-                )
-                sys.exit(1)
-            green("- Image mounted successfully at: " + mountpoint)
-
-            workspace_dir = get_workspace_dir()
-            # remove prior overlay colcon workspace files at "/<workspace_dir>",
-            #  and copy the <ws>/install directory as such
-            if os.path.exists(mountpoint + "/" + workspace_dir):
-                cmd = "sudo rm -r " + mountpoint + "/" + workspace_dir + "/*"
-                outs, errs = run(cmd, shell=True)
-                if errs:
-                    red(
-                        "Something went wrong while removing image workspace.\n"
-                        + "Review the output: "
-                        + errs
-                    )
-                    sys.exit(1)
-                green(
-                    "- Successfully cleaned up prior overlay colcon workspace "
-                    + "at: "
-                    + mountpoint
-                    + "/"
-                    + workspace_dir
-                )
-            else:
-                yellow(
-                    "No prior overlay colcon workspace found "
-                    + "at: "
-                    + mountpoint
-                    + "/"
-                    + workspace_dir
-                    + ", creating it."
-                )
-                cmd = "sudo mkdir " + mountpoint + "/" + workspace_dir
-                outs, errs = run(cmd, shell=True)
-                if errs:
-                    red(
-                        "Something went wrong while creating overlay colcon workspace.\n"
-                        + "Review the output: "
-                        + errs
-                    )
-                    sys.exit(1)
-
-            install_dir = get_install_dir(context.args.install_dir)
-            cmd = "sudo cp -r " + install_dir + "/* " + mountpoint + "/" + workspace_dir
-            outs, errs = run(cmd, shell=True)
-            if errs:
-                red(
-                    "Something went wrong while copying overlay colcon workspace to mountpoint.\n"
-                    + "Review the output: "
-                    + errs
-                )
-                sys.exit(1)
-            green(
-                "- Copied '"
-                + context.args.install_dir
-                + "' directory as a ROS 2 overlay workspace in the raw image"
-                + " at location: /"
-                + workspace_dir
-                + "."
-            )
-
-            # Create setup.bash and copy to mountpoint in target_dir
-            script_path = create_ros2_overlay_script()
-            target_dir_embedded = "/opt/ros/foxy/"
-            target_dir = mountpoint + target_dir_embedded
-
-            cmd = "sudo mkdir -p " + target_dir
-            outs, errs = run(cmd, shell=True)
-            if errs:
-                red(
-                    "Something went wrong while creating "
-                    + target_dir
-                    + ".\n"
-                    + "Review the output: "
-                    + errs
-                )
-                sys.exit(1)
-
-            cmd = "sudo cp " + script_path + " " + target_dir
-            outs, errs = run(cmd, shell=True)
-            if errs:
-                red(
-                    "Something went wrong while copying "
-                    + script_path
-                    + " to "
-                    + target_dir
-                    + ".\n"
-                    + "Review the output: "
-                    + errs
-                )
-                sys.exit(1)
-            green(
-                "- Created and copied in rootfs " + target_dir_embedded + "setup.bash."
-            )
-
-            #########################
-            # 3. syncs and umount the raw image
-            #########################
-            cmd = "sync && sudo umount " + mountpoint
-            outs, errs = run(cmd, shell=True, timeout=15)
-            if errs:
-                red(
-                    "Something went wrong while umounting the raw image.\n"
-                    + "Review the output: "
-                    + errs
-                )
-                sys.exit(1)
-            green("- Umounted the raw image.")
-
         #########################
         # 4. generates emulation files on-the-go
         #########################
         firmware_dir = get_firmware_dir()
         emulation_files_dir = firmware_dir + "/emulation"
-        cmd = "mkdir -p " + emulation_files_dir
-        outs, errs = run(cmd, shell=True)
-        if errs:
+        try:
+            os.makedirs(emulation_files_dir, exist_ok=True)
+        except OSError as e:
             red(
                 "Something went wrong while creating emulation directory in firmware.\n"
                 + "Review the output: "
-                + errs
+                + str(e)
             )
             sys.exit(1)
 
@@ -508,29 +513,14 @@ class EmulationSubverb(AccelerationSubverbExtensionPoint):
         # 5. launches emulator
         #########################
         yellow("- Launching emulation...")
-        # set the path right...
-        vitis_dir = get_vitis_dir()
-        firmware_dir = get_firmware_dir()
-        emulation_files_dir = firmware_dir + "/emulation"
+        emulation_files_dir = get_firmware_dir() + "/emulation"
 
-        cmd = (
-            "cd "
-            + emulation_files_dir
-            + " && "
-            + vitis_dir
-            + "/bin/launch_emulator -device-family ultrascale "
-            "-target "
-            + context.args.emulation_type
-            + " -qemu-args-file "
-            + emulation_file_qemu
-            + " -pmc-args-file "
-            + emulation_file_pmu
-            + " -sd-card-image "
-            + rawimage_path
-            + " -enable-prep-target $*"
-        )
-        print(cmd)
-        os.system(cmd)
+        argv = _emulator_argv(context, emulation_file_qemu, emulation_file_pmu) + [
+            "-sd-card-image",
+            rawimage_path,
+            "-enable-prep-target",
+        ]
+        _launch_emulator(argv, emulation_files_dir)
         green("Finalized successfully.")
 
     def hw_emu(self, context):  # noqa: D102
@@ -555,44 +545,29 @@ class EmulationSubverb(AccelerationSubverbExtensionPoint):
 
         platform = self.get_platform()
 
+        emulation_files_dir = get_firmware_dir() + "/emulation"
         # TODO: describe more pl_sim_dir
-        pl_sim_dir = get_firmware_dir() + "/emulation/sim/behav_waveform/xsim"
-        firmware_dir = get_firmware_dir()
-        emulation_files_dir = firmware_dir + "/emulation"
+        pl_sim_dir = emulation_files_dir + "/sim/behav_waveform/xsim"
 
         #########################
         # 5. launches emulator
         #########################
         yellow("- Launching emulation...")
-        # set the path right...
-        vitis_dir = get_vitis_dir()
-        cmd = (
-            "cd "
-            + emulation_files_dir
-            + " && "
-            + " PATH=$PATH:"
-            + get_vivado_dir()
-            + "/bin "
-            + vitis_dir
-            + "/bin/launch_emulator -device-family ultrascale "
-            "-target "
-            + context.args.emulation_type
-            + " -qemu-args-file "
-            + emulation_file_qemu
-            + " -pmc-args-file "
-            + emulation_file_pmu
-            + " -pl-sim-dir "
-            + pl_sim_dir
-            + " -sd-card-image "
-            + rawimage_path
-            + " -enable-prep-target "
-            + " -xtlm-log-state WAVEFORM_AND_LOG "
-            + " -platform-name "
-            + platform
-            + " "
-            + " $* "
-        )
-        os.system(cmd)
+        argv = _emulator_argv(context, emulation_file_qemu, emulation_file_pmu) + [
+            "-pl-sim-dir",
+            pl_sim_dir,
+            "-sd-card-image",
+            rawimage_path,
+            "-enable-prep-target",
+            "-xtlm-log-state",
+            "WAVEFORM_AND_LOG",
+            "-platform-name",
+            platform,
+        ]
+        # Vivado's tools (e.g. xsim) are looked up in PATH
+        env = dict(os.environ)
+        env["PATH"] = env.get("PATH", "") + ":" + get_vivado_dir() + "/bin"
+        _launch_emulator(argv, emulation_files_dir, env=env)
         green("Finalized successfully.")
 
     def main(self, *, context):  # noqa: D102
@@ -1,17 +1,20 @@
 # Copyright 2022 Víctor Mayoral-Vilches
 # Licensed under the Apache License, Version 2.0
 
+import argparse
+import collections
+import concurrent.futures
+import functools
 import os
+import re
+import signal
 import sys
+import threading
 
-from colcon_core.package_discovery import discover_packages
-from colcon_core.package_identification import get_package_identification_extensions
-from colcon_core.plugin_system import satisfies_version
 from colcon_hardware_acceleration.subverb import (
     AccelerationSubverbExtensionPoint,
     check_install_directory,
     get_rawimage_path,
-    run,
     get_install_dir,
     get_firmware_dir,
     get_vitis_dir,
@@ -28,8 +31,116 @@ from colcon_hardware_acceleration.verb import (
     grayinline,
     magenta,
     gray,
+    colored_batch,
 )
 
+# BRAM_18K, DSP, FF and LUT cells of the "Total" and "Utilization (%)" rows
+# of a synthesis report
+_RE_RESOURCES = re.compile(r"\s*\|[^|]*\|" + r"\s*([^|]*?)\s*\|" * 4)
+
+# find_tcl_package() results, per (workspace, package), along with the
+# modification times that validate them
+_TCL_CACHE = {}
+
+
+def _mtime_ns(path):
+    """Return the modification time of path in ns, or None if it's gone."""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _fields(line):
+    """Split a row of a Vitis HLS report table into its stripped cells."""
+    return tuple(x.strip() for x in line.split("|"))
+
+
+def _scan(path):
+    """List path in one pass, returning the names of its files and subdirectories.
+
+    A missing directory yields two empty sets.
+    """
+    files, dirs = set(), set()
+    try:
+        with os.scandir(path) as it:
+            for e in it:
+                (dirs if e.is_dir() else files).add(e.name)
+    except OSError:
+        pass
+    return files, dirs
+
+
+def _positive_int(value):
+    """Parse a strictly positive integer command line argument."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got '{value}'")
+    return number
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_tcl(tcl, mtime_ns):
+    """Parse a Tcl script into the config dict returned by HLSSubverb.process_tcl.
+
+    Cached per script, the modification time invalidating stale entries. The
+    dict is shared between callers and must not be mutated. The first
+    open_project -reset and set_top statements are used. Raises ValueError if
+    the script is incomplete.
+    """
+    tcl_dic = {}
+
+    # single pass over the script, dispatching on the statement prefix
+    project = top = None
+    solutions = []
+    clocks = []
+    parts = []
+    with open(tcl, "r") as f:
+        for line in f:
+            s = line.strip()
+            if s.startswith("open_project -reset ") and project is None:
+                project = s[20:].strip()
+            elif s.startswith("open_solution "):
+                solutions.append(s[14:].strip())
+            elif s.startswith("create_clock -period "):
+                clocks.append(s[21:].strip())
+            elif s.startswith("set_part {"):
+                parts.append(s[10:].rpartition("}")[0])
+            elif s.startswith("set_top ") and top is None:
+                top = s[8:].strip()
+
+    if project is None or top is None:
+        raise ValueError("Tcl " + tcl + " lacks an open_project or set_top statement")
+    path = os.path.dirname(tcl) + "/" + project
+
+    if len(solutions) != len(clocks) or len(solutions) != len(parts):
+        raise ValueError(
+            "Size mismatch between solutions, clocks and parts in Tcl " + tcl
+        )
+
+    # assign the dict
+    tcl_dic["project"] = project
+    tcl_dic["path"] = path
+    tcl_dic["top"] = top
+    tcl_dic["solutions"] = []
+    for i in range(len(solutions)):
+        solution = {
+            solutions[i]
+            .replace("-flow_target vitis", "")
+            .strip(): {
+                "clock": clocks[i],
+                "path": path
+                + "/"
+                + solutions[i].replace("-flow_target vitis", "").strip(),
+            }
+        }
+        tcl_dic["solutions"].append(solution)
+
+    return tcl_dic
+
 
 class HLSSubverb(AccelerationSubverbExtensionPoint):
     """Vitis HLS capabilities management extension.
@@ -43,12 +154,6 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
 
     """
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(
-            AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0"
-        )
-
     def add_arguments(self, *, parser):  # noqa: D102
 
         argument = parser.add_argument(
@@ -64,6 +169,14 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
             action="store_true",
             help="Run HLS from CLI according to the Tcl scripts",
         )
+        argument = parser.add_argument(
+            "--jobs",
+            dest="jobs",
+            type=_positive_int,
+            default=1,
+            help="Maximum number of Tcl scripts run concurrently with --run "
+            "(defaults to 1, each vitis_hls run may take several GB of memory)",
+        )
         argument = parser.add_argument(
             "--silent",
             dest="silent",
@@ -80,17 +193,16 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
     def find_tcl_package(self, package_name):
         """Find Tcl scripts for the package_name
 
-        NOTE: silly filtering based on simply substring matching, consider
-        more complex filtering with end-of-string if necessary in the future
+        NOTE: build directories are matched on the "build" substring, Tcl
+        scripts on the ".tcl" suffix
 
         :param string package_name: ROS 2 package name whereto execute HLS
         :rtype list
         """
         current_dir = os.environ.get("PWD", "")
-        filter_data = [
-            x for x in os.listdir(current_dir) if all(y in x for y in ["build"])
-        ]
-        if len(filter_data) < 1:
+        with os.scandir(current_dir) as it:
+            filter_data = [e for e in it if e.is_dir() and "build" in e.name]
+        if not filter_data:
             red(
                 "No build* directories found.\n"
                 + "Make sure you're in the root of your colcon workspace and the build "
@@ -98,25 +210,39 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
             )
             sys.exit(1)
 
+        # reuse a previous scan while neither the build* dirs nor the package
+        #  dirs in them changed (i.e. no entry was added, removed or renamed)
+        key = (current_dir, package_name)
+        stamp = tuple(sorted((e.name, e.stat().st_mtime_ns) for e in filter_data))
+        cached = _TCL_CACHE.get(key)
+        if (
+            cached
+            and cached[0] == stamp
+            and all(_mtime_ns(p) == mtime_ns for p, mtime_ns in cached[1])
+        ):
+            return list(cached[2])
+
         package_paths = []  # paths under a build* dir that match with package_name
         package_paths_tcl = []  # above, and that contain a .tcl file
         for buildir in filter_data:
-            build_current_dir = current_dir + "/" + buildir
-            for x in os.listdir(build_current_dir):
-                # if all(y in x for y in [package_name]):
-                if x == package_name:
-                    package_paths.append(build_current_dir + "/" + x)
+            with os.scandir(buildir.path) as it:
+                for e in it:
+                    if e.name == package_name and e.is_dir():
+                        package_paths.append(e.path)
 
         for p in package_paths:
-            for x in os.listdir(p):
-                if all(y in x for y in [".tcl"]):
-                    package_paths_tcl.append(p + "/" + x)
-
-        # drop any matches of .tcl.in as this is part of the ament generation process
-        package_paths_tcl = [
-            x for x in package_paths_tcl if all(y not in x for y in [".tcl.in"])
-        ]
+            with os.scandir(p) as it:
+                # .tcl.in templates, part of the ament generation process, are
+                # left out by matching on the suffix
+                package_paths_tcl.extend(
+                    e.path for e in it if e.name.endswith(".tcl") and e.is_file()
+                )
 
+        _TCL_CACHE[key] = (
+            stamp,
+            tuple((p, _mtime_ns(p)) for p in package_paths),
+            tuple(package_paths_tcl),
+        )
         return package_paths_tcl
 
     def process_tcl(self, tcl):
@@ -141,45 +267,69 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
         :param string tcl: Tcl script path
         :rtype dict
         """
-        tcl_dic = {}
-
-        import re
-
         if not exists(tcl):
             red("Tcl " + tcl + " not found")
             sys.exit(1)
 
-        data = open(tcl, "r").read()
-        project = re.findall("open_project -reset (.*)", data)[0]
-        solutions = re.findall("open_solution (.*)", data)
-        clocks = re.findall("create_clock -period (.*)", data)
-        parts = re.findall("set_part {(.*)}", data)
-        path = re.findall("(.*)/.*$", tcl)[0] + "/" + project
-        top = re.findall("set_top (.*)", data)[0]
+        try:
+            return _parse_tcl(tcl, os.stat(tcl).st_mtime_ns)
+        except ValueError as e:
+            red(str(e))
+            sys.exit(1)
+
+    def launch_tcl(self, context, tcl, parallel=False):
+        """Launch vitis_hls on a Tcl script, without waiting for it
+
+        The projects of the script are created relative to its directory.
+
+        :param string tcl: path to Tcl script
+        :param bool parallel: run alongside other vitis_hls processes, the log
+            goes to a directory of its own so that scripts of the same package
+            don't overwrite each other's (<script dir>/.vitis_hls/<script>/),
+            and vitis_hls (and its children) to a new session, so that they can
+            be terminated as a group
+        :rtype: subprocess.Popen, with stdout piped if verbose
+        """
+        # imported here, only --run spawns processes
+        import subprocess
 
-        if len(solutions) != len(clocks) or len(solutions) != len(parts):
-            red("Size mismatch between solutions, clocks and parts")
+        cmd = ["vitis_hls", "-f", tcl]
+        # stream the (long) output as it's produced rather than holding it in
+        #  memory, and drop it altogether unless verbose
+        try:
+            if parallel:
+                log_dir = os.path.join(
+                    os.path.dirname(tcl),
+                    ".vitis_hls",
+                    os.path.splitext(os.path.basename(tcl))[0],
+                )
+                os.makedirs(log_dir, exist_ok=True)
+                cmd += ["-l", os.path.join(log_dir, "vitis_hls.log")]
+            return subprocess.Popen(
+                cmd,
+                cwd=os.path.dirname(tcl),
+                stdout=subprocess.PIPE if context.args.verbose else subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                encoding="utf-8",
+                errors="replace",
+                start_new_session=parallel,
+            )
+        except OSError as e:
+            red("Unable to launch vitis_hls: " + str(e))
             sys.exit(1)
 
-        # assign the dict
-        tcl_dic["project"] = project
-        tcl_dic["path"] = path
-        tcl_dic["top"] = top
-        tcl_dic["solutions"] = []
-        for i in range(len(solutions)):
-            solution = {
-                solutions[i]
-                .replace("-flow_target vitis", "")
-                .strip(): {
-                    "clock": clocks[i],
-                    "path": path
-                    + "/"
-                    + solutions[i].replace("-flow_target vitis", "").strip(),
-                }
-            }
-            tcl_dic["solutions"].append(solution)
+    def wait_tcl(self, context, proc, prefix=""):
+        """Wait for a vitis_hls process, echoing its output if verbose
 
-        return tcl_dic
+        :param proc: process, as returned by launch_tcl()
+        :param string prefix: prepended to each line of output
+        :rtype: int, exit status
+        """
+        if context.args.verbose:
+            for line in proc.stdout:
+                sys.stdout.write(prefix + line)
+            proc.stdout.close()
+        return proc.wait()
 
     def run_tcl(self, context, tcl):
         """Run Tcl script with vitis_hls
@@ -187,15 +337,58 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
         :param string tcl: path to Tcl script
         :rtype: None
         """
-        cmd = (
-            "cd " + tcl[: tcl.rfind("/")] + " && vitis_hls -f " + tcl + " 2> /dev/null"
-        )
-        outs, errs = run(cmd, shell=True)
-        if errs:
-            red(errs)
+        returncode = self.wait_tcl(context, self.launch_tcl(context, tcl))
+        if returncode:
+            red(f"vitis_hls -f {tcl} exited with status {returncode}")
             sys.exit(1)
-        if context.args.verbose:
-            print(outs)
+
+    def run_tcl_parallel(self, context, tcls, jobs):
+        """Run Tcl scripts with up to jobs concurrent vitis_hls processes
+
+        The first failure is reported right away, the other runs are
+        terminated (or never launched) rather than waited for.
+
+        :param list tcls: paths to Tcl scripts
+        :param int jobs: maximum number of concurrent processes
+        :rtype: None
+        """
+        processes = []
+        aborted = threading.Event()
+        lock = threading.Lock()
+
+        def run(tcl):
+            with lock:
+                if aborted.is_set():
+                    return 0
+                proc = self.launch_tcl(context, tcl, parallel=True)
+                processes.append(proc)
+            # tell apart the interleaved output of each script
+            prefix = "[" + os.path.basename(tcl) + "] "
+            return self.wait_tcl(context, proc, prefix)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+        try:
+            futures = {executor.submit(run, tcl): tcl for tcl in tcls}
+            for future in concurrent.futures.as_completed(futures):
+                returncode = future.result()
+                if returncode:
+                    red(
+                        f"vitis_hls -f {futures[future]} exited with status "
+                        f"{returncode}"
+                    )
+                    sys.exit(1)
+        finally:
+            # also on KeyboardInterrupt, the processes don't get the terminal's
+            #  SIGINT in their own sessions
+            with lock:
+                aborted.set()
+                for proc in processes:
+                    if proc.poll() is None:
+                        try:
+                            os.killpg(proc.pid, signal.SIGTERM)
+                        except OSError:
+                            pass  # already gone
+            executor.shutdown(wait=True)
 
     def print_status_solution(self, solution, configuration, context):
         """Print the status of a solution
@@ -216,13 +409,17 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
         # gather project status
         #######################
         project_status = []
-        csimlog_path = (
-            solution_dict["path"] + "/csim/report/" + configuration["top"] + "_csim.log"
-        )
+        solution_path = solution_dict["path"]
+        top = configuration["top"]
+        csimlog_path = f"{solution_path}/csim/report/{top}_csim.log"
         try:
-            with open(csimlog_path, "r") as f:
-                # Pass/Fail info is always in the second last line of the csim report
-                status_line = f.readlines()[-2]
+            with open(csimlog_path, "rb") as f:
+                # Pass/Fail info is always in the second last line of the csim report,
+                # only read the tail of it
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 4096))
+                tail = f.read().decode("utf-8", "replace").splitlines()
+                status_line = tail[-2] if len(tail) >= 2 else "".join(tail)
                 if "0 errors" in status_line.lower():
                     project_status.append("csim_pass")
                 elif "fail" in status_line.lower():
@@ -234,23 +431,13 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
             pass
 
         # Pull setails from csynth report
-        csyn_path = (
-            solution_dict["path"]
-            + "/syn/report/"
-            + configuration["top"]
-            + "_csynth.rpt"
-        )
+        csyn_path = f"{solution_path}/syn/report/{top}_csynth.rpt"
         if os.path.isfile(csyn_path):
             project_status.append("syn_done")
 
         # Pull details from cosim report
         try:
-            cosim_path = (
-                solution_dict["path"]
-                + "/sim/report/"
-                + configuration["top"]
-                + "_cosim.rpt"
-            )
+            cosim_path = f"{solution_path}/sim/report/{top}_cosim.rpt"
             with open(cosim_path, "r") as f:
                 # search through cosim report to find out pass/fail status for each language
                 for line in f:
@@ -267,34 +454,30 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
             pass
 
         # Pull details from implementation directory, first the presence of an export...
-        if os.path.isdir(solution_dict["path"] + "/impl/ip"):
+        # (listing each directory once, and only those that exist)
+        impl_path = solution_path + "/impl"
+        _, impl_dirs = _scan(impl_path)
+        if "ip" in impl_dirs:
             project_status.append("export_ip_done")
-        if os.path.isdir(solution_dict["path"] + "/impl/sysgen"):
+        if "sysgen" in impl_dirs:
             project_status.append("export_sysgen_done")
         # implementation, verilog and vhdl
-        if os.path.isfile(
-            solution_dict["path"] + "/impl/verilog/" + configuration["top"] + ".v"
-        ):
-            project_status.append("implementation_verilog")
-        if os.path.isfile(
-            solution_dict["path"] + "/impl/vhdl/" + configuration["top"] + ".vhd"
-        ):
-            project_status.append("implementation_vhdl")
+        if "verilog" in impl_dirs:
+            verilog_files, _ = _scan(impl_path + "/verilog")
+            if top + ".v" in verilog_files:
+                project_status.append("implementation_verilog")
+        if "vhdl" in impl_dirs:
+            vhdl_files, _ = _scan(impl_path + "/vhdl")
+            if top + ".vhd" in vhdl_files:
+                project_status.append("implementation_vhdl")
         # export
-        if os.path.isfile(
-            solution_dict["path"]
-            + "/impl/report/verilog/"
-            + configuration["top"]
-            + "_export.rpt"
-        ):
-            project_status.append("export_verilog")
-        if os.path.isfile(
-            solution_dict["path"]
-            + "/impl/report/vhdl/"
-            + configuration["top"]
-            + "_export.rpt"
-        ):
-            project_status.append("export_vhdl")
+        if "report" in impl_dirs:
+            _, report_dirs = _scan(impl_path + "/report")
+            for language in ("verilog", "vhdl"):
+                if language in report_dirs:
+                    report_files, _ = _scan(f"{impl_path}/report/{language}")
+                    if top + "_export.rpt" in report_files:
+                        project_status.append("export_" + language)
 
         #######################
         # print project status
@@ -328,13 +511,12 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
         green("Run") if "evaluate_done" in project_status else yellow("Not Run")
 
         if context.args.synthesis_report:
-            if os.path.exists(csyn_path):
-                gray("\t\t- Synthesis report: " + csyn_path)
+            try:
                 with open(csyn_path, "r") as f:
-                    report = f.readlines()
-                    for l in report:
+                    gray("\t\t- Synthesis report: " + csyn_path)
+                    for l in f:
                         grayinline("\t\t\t" + l)
-            else:
+            except OSError:
                 red("\t\t- No synthesis report found at: " + csyn_path)
 
         # # NOTE: replaced by --synthesis-report instead
@@ -400,77 +582,69 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
         #                 'path': '<path-to-ros2-ws>/build-zcu102/simple_adder/project_simpleadder1/solution_4ns'}
         # },
         solutions = configuration["solutions"]
+        top = configuration["top"]
 
         for s in solutions:
             solution_key = list(s.keys())[0]
-            csyn_path = (
-                s[solution_key]["path"]
-                + "/syn/report/"
-                + configuration["top"]
-                + "_csynth.rpt"
-            )
+            csyn_path = f"{s[solution_key]['path']}/syn/report/{top}_csynth.rpt"
             # print(csyn_path)
             try:
                 with open(csyn_path, "r") as f:
-                    results_from_solution = []
-
-                    # Fetch line 23:
+                    # Stream the report once, keeping only the lines needed:
+                    #  - line 23, clock
+                    #  - line 32, latency
+                    #  - "Utilization (%)" (by default line 63) and the "Total"
+                    #    line, 4 lines above it
+                    ap_clk_line = summary_line = None
+                    total_line = utilization_line = None
+                    previous_lines = collections.deque(maxlen=5)
+                    for i, line in enumerate(f):
+                        previous_lines.append(line)
+                        if i == 22:
+                            ap_clk_line = line
+                        elif i == 31:
+                            summary_line = line
+                        elif i == 58 and utilization_line is None:
+                            total_line = line
+                        elif i == 62 and utilization_line is None:
+                            utilization_line = line
+                        # these lines may not always be in the same positon
+                        # thereby we need to search for them
+                        if "Utilization" in line:
+                            utilization_line = line
+                            total_line = previous_lines[0]
+                    if None in (ap_clk_line, summary_line, utilization_line):
+                        continue  # truncated report
+
+                    # Line 23, clock
                     #       |ap_clk  |   5.00|     3.492|        0.62|
-                    report_content = f.readlines()
-                    ap_clk_line = report_content[22]
-                    ap_clk_line_elements = [x.strip() for x in ap_clk_line.split("|")]
-                    clk_target = ap_clk_line_elements[2].split()[0]
-                    clk_estimated = ap_clk_line_elements[3].split()[0]
-                    clk_uncertainty = ap_clk_line_elements[4].split()[0]
-                    results_from_solution.append(clk_target)
-                    results_from_solution.append(clk_estimated)
-
-                    # Fetch line 32, latency in cycles
+                    clk = _fields(ap_clk_line)
+                    # Line 32, latency in cycles
                     #       |        4|        4|  16.000 ns|  16.000 ns|    5|    5|     none|
-                    summary_line = report_content[31]
-                    summary_line_elements = [x.strip() for x in summary_line.split("|")]
-                    latency_max = summary_line_elements[4].split()[0]
-                    # results_from_solution.append((float(clk_estimated) + float(clk_uncertainty))*float(interval_max))
-                    results_from_solution.append(latency_max)
-
-                    # Fetch lines 59 and 63
+                    latency = _fields(summary_line)
+                    # Lines 59 and 63 (by default)
                     #      |Total            |        0|     0|     596|     217|    0|
                     #      |Utilization (%)  |        0|     0|      ~0|      ~0|    0|
-                    # By default it's line 63
-                    total_line = report_content[58]
-                    utilization_line = report_content[62]
-
-                    # these lines may not always be in the same positon thereby we need to search for it
-                    # and rewrite it
-                    for i in range(len(report_content)):
-                        if "Utilization" in report_content[i]:
-                            utilization_line = report_content[i]
-                            total_line = report_content[i - 4]
-
-                    # parse utilization %
-                    utilization_line_elements = [
-                        x.strip() for x in utilization_line.split("|")
-                    ]
-                    bram_utilization = utilization_line_elements[2]
-                    dsp_utilization = utilization_line_elements[3]
-                    ff_utilization = utilization_line_elements[4]
-                    lut_utilization = utilization_line_elements[5]
-
-                    # parse total
-                    total_line_elements = [x.strip() for x in total_line.split("|")]
-                    bram_total = total_line_elements[2]
-                    dsp_total = total_line_elements[3]
-                    ff_total = total_line_elements[4]
-                    lut_total = total_line_elements[5]
-
-                    results_from_solution.append(bram_total)
-                    results_from_solution.append(bram_utilization)
-                    results_from_solution.append(dsp_total)
-                    results_from_solution.append(dsp_utilization)
-                    results_from_solution.append(ff_total)
-                    results_from_solution.append(ff_utilization)
-                    results_from_solution.append(lut_total)
-                    results_from_solution.append(lut_utilization)
+                    total = _RE_RESOURCES.match(total_line)
+                    utilization = _RE_RESOURCES.match(utilization_line)
+                    if not total or not utilization:
+                        continue
+                    bram_total, dsp_total, ff_total, lut_total = total.groups()
+                    bram_util, dsp_util, ff_util, lut_util = utilization.groups()
+
+                    results_from_solution = (
+                        clk[2].split()[0],  # clk_target
+                        clk[3].split()[0],  # clk_estimated
+                        latency[4].split()[0],  # latency_max
+                        bram_total,
+                        bram_util,
+                        dsp_total,
+                        dsp_util,
+                        ff_total,
+                        ff_util,
+                        lut_total,
+                        lut_util,
+                    )
 
                     # append results from this iteration in the general dictionary
                     results[solution_key] = results_from_solution
@@ -486,87 +660,23 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
         #     "solutionN": [clk_target, clk_estimated, latency_max,
         #                        ,bram_total, bram_utilization, dsp_total, dsp_utilization,
         #                         ff_total, ff_utilization, lut_total, lut_utilization]
-        print(
-            "Solution#"
-            + "\t"
-            + "tar.clk"
-            + "\t"
-            + "est.clk"
-            + "\t\t"
-            + "latency_max"
-            + "\t"
-            + "BRAM_18K"
-            + "\t"
-            + "DSP"
-            + "\t"
-            + "FF"
-            + "\t\t"
-            + "LUT"
-        )
+        lines = ["Solution#\ttar.clk\test.clk\t\tlatency_max\tBRAM_18K\tDSP\tFF\t\tLUT"]
 
         # Order dict according to time, (element[2])
+        # NOTE: sorted() evaluates the key once per solution, not per comparison
+        results = list(results.items())
         try:
-            results = sorted(results.items(), key=lambda x: float(x[1][2]))
+            results = sorted(results, key=lambda x: float(x[1][2]))
         except ValueError:
             pass  # wasn't able to order them
 
-        # Print results
-        if type(results) is list:
-            for key, element in results:
-                print(
-                    str(key)
-                    + "\t"
-                    + str(element[0])
-                    + "\t"
-                    + str(element[1])
-                    + "\t\t"
-                    + str(element[2])
-                    + "\t\t"
-                    + str(element[3])
-                    + " ("
-                    + str(element[4])
-                    + "%)\t\t"
-                    + str(element[5])
-                    + " ("
-                    + str(element[6])
-                    + "%)\t"
-                    + str(element[7])
-                    + " ("
-                    + str(element[8])
-                    + "%)\t"
-                    + str(element[9])
-                    + " ("
-                    + str(element[10])
-                    + "%)\t"
-                )
-        else:
-            for key, element in results.items():
-                print(
-                    str(key)
-                    + "\t"
-                    + str(element[0])
-                    + "\t"
-                    + str(element[1])
-                    + "\t\t"
-                    + str(element[2])
-                    + "\t\t"
-                    + str(element[3])
-                    + " ("
-                    + str(element[4])
-                    + "%)\t\t"
-                    + str(element[5])
-                    + " ("
-                    + str(element[6])
-                    + "%)\t"
-                    + str(element[7])
-                    + " ("
-                    + str(element[8])
-                    + "%)\t"
-                    + str(element[9])
-                    + " ("
-                    + str(element[10])
-                    + "%)\t"
-                )
+        # Print results, header and rows in a single write
+        lines.extend(
+            f"{key}\t{e[0]}\t{e[1]}\t\t{e[2]}\t\t{e[3]} ({e[4]}%)\t\t"
+            f"{e[5]} ({e[6]}%)\t{e[7]} ({e[8]}%)\t{e[9]} ({e[10]}%)\t"
+            for key, e in results
+        )
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def main(self, *, context):  # noqa: D102
         if not context.args.package_name:
@@ -574,15 +684,13 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
             sys.exit(1)
 
         package_paths_tcl = self.find_tcl_package(context.args.package_name)
-        if len(package_paths_tcl) > 0:
-            pass
-        else:
+        if not package_paths_tcl:
             yellow("No HLS Tcl scripts found for package: " + context.args.package_name)
 
         ########
         # run
         ########
-        if context.args.run:  # run Tcl scripts
+        if context.args.run and package_paths_tcl:  # run Tcl scripts
             for tcl in package_paths_tcl:
                 if not context.args.silent:
                     print(
@@ -593,35 +701,42 @@ class HLSSubverb(AccelerationSubverbExtensionPoint):
                     )
                     print("Executing " + tcl)
 
-                # launch
-                self.run_tcl(context, tcl)
+            # launch
+            jobs = min(context.args.jobs, len(package_paths_tcl))
+            if jobs == 1:
+                for tcl in package_paths_tcl:
+                    self.run_tcl(context, tcl)
+            else:
+                self.run_tcl_parallel(context, package_paths_tcl, jobs)
             # sys.exit(0)
 
         ########
         # summary
         ########
         if context.args.summary:
-            for tcl in package_paths_tcl:
-                gray(
-                    "# " + str(tcl)
-                )  # print which project, differentiate when multiple available
-                configuration = self.process_tcl(tcl)
-                solutions = configuration["solutions"]
-                if len(solutions) > 0:
-                    self.print_summary_solutions(configuration)
+            with colored_batch():
+                for tcl in package_paths_tcl:
+                    gray(
+                        "# " + str(tcl)
+                    )  # print which project, differentiate when multiple available
+                    configuration = self.process_tcl(tcl)
+                    solutions = configuration["solutions"]
+                    if len(solutions) > 0:
+                        self.print_summary_solutions(configuration)
             sys.exit(0)
 
         ########
         # status
         ########
         if not context.args.silent:
-            for tcl in package_paths_tcl:
-                configuration = self.process_tcl(tcl)
-                solutions = configuration["solutions"]
-                if len(solutions) > 0:
-                    grayinline("Project: ")
-                    print(configuration["project"])
-                    grayinline("Path: ")
-                    print(configuration["path"])
-                    for s in solutions:
-                        self.print_status_solution(s, configuration, context)
+            with colored_batch():
+                for tcl in package_paths_tcl:
+                    configuration = self.process_tcl(tcl)
+                    solutions = configuration["solutions"]
+                    if len(solutions) > 0:
+                        grayinline("Project: ")
+                        print(configuration["project"])
+                        grayinline("Path: ")
+                        print(configuration["path"])
+                        for s in solutions:
+                            self.print_status_solution(s, configuration, context)
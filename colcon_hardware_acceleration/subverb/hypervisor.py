@@ -6,7 +6,6 @@ import sys
 import errno
 from pathlib import Path
 
-from colcon_core.plugin_system import satisfies_version
 from colcon_hardware_acceleration.subverb import (
     AccelerationSubverbExtensionPoint,
     get_vitis_dir,
@@ -22,7 +21,8 @@ from colcon_hardware_acceleration.subverb import (
     add_kernel,
     exists,
     copy_colcon_workspace,
-    copy_libstdcppfs
+    copy_libstdcppfs,
+    _sudo,
 )
 from colcon_hardware_acceleration.verb import green, yellow, red, gray
 
@@ -42,10 +42,6 @@ class HypervisorSubverb(AccelerationSubverbExtensionPoint):
     Configure the Xen hypervisor.
     """
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0")
-
     def add_arguments(self, *, parser):  # noqa: D102
 
         # debug arg, show configuration and leave temp. dir (do not delete)
@@ -123,7 +119,7 @@ class HypervisorSubverb(AccelerationSubverbExtensionPoint):
 
         # create auxiliary directory for compiling all artifacts for the hypervisor
         auxdir = "/tmp/hypervisor"
-        run("mkdir " + auxdir, shell=True, timeout=1)
+        os.makedirs(auxdir, exist_ok=True)
 
         # copy the artifacts to auxiliary directory
         run(
@@ -162,9 +158,6 @@ class HypervisorSubverb(AccelerationSubverbExtensionPoint):
                 else:
                     raise e
 
-            if not os.path.exists(bootbin_symlink_path):
-                red("BOOT.BIN file " + bootbin_symlink_path + " not found.")
-                sys.exit(1)
             green("- Found device BOOT.BIN file: " + str(bootbin_symlink_path))
             run(
                 "cp " + str(bootbin_symlink_path) + " " + auxdir + "/BOOT.BIN",
@@ -319,8 +312,8 @@ class HypervisorSubverb(AccelerationSubverbExtensionPoint):
 
         mountpoint_partition = mountpointn + str(partition)
         # create Xen missing dir
-        cmd = "sudo mkdir -p " + mountpoint_partition + "/var/lib/xen"
-        outs, errs = run(cmd, shell=True, timeout=5)
+        cmd = _sudo("mkdir", "-p", mountpoint_partition + "/var/lib/xen")
+        outs, errs = run(cmd, timeout=5)
         if errs:
             red(
                 "Something went wrong while creating Xen /var/lib/xen directory in rootfs.\n"
@@ -391,7 +384,7 @@ class HypervisorSubverb(AccelerationSubverbExtensionPoint):
 
         # create auxiliary directory for compiling all artifacts for the hypervisor
         auxdir = "/tmp/hypervisor"
-        run("mkdir " + auxdir + " 2> /dev/null", shell=True, timeout=1)
+        os.makedirs(auxdir, exist_ok=True)
 
         firmware_dir = get_firmware_dir()  # directory where firmware is
 
@@ -672,9 +665,6 @@ class HypervisorSubverb(AccelerationSubverbExtensionPoint):
                         else:
                             raise e
 
-                    if not os.path.exists(bootbin_symlink_path):
-                        red("BOOT.BIN file " + bootbin_symlink_path + " not found.")
-                        sys.exit(1)
                     green("- Found device BOOT.BIN file: " + str(bootbin_symlink_path))
                     run(
                         "cp " + str(bootbin_symlink_path) + " " + auxdir + "/BOOT.BIN",
@@ -6,7 +6,6 @@ import sys
 import errno
 from pathlib import Path
 
-from colcon_core.plugin_system import satisfies_version
 from colcon_hardware_acceleration.subverb import (
     AccelerationSubverbExtensionPoint,
     get_vitis_dir,
@@ -46,12 +45,6 @@ class LinuxSubverb(AccelerationSubverbExtensionPoint):
     - "colcon acceleration linux preempt_rt": select low latency, fully preemptible Linux kernel
     """
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(
-            AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0"
-        )
-
     def add_arguments(self, *, parser):  # noqa: D102
         argument = parser.add_argument(
             "type",
@@ -248,9 +241,6 @@ class LinuxSubverb(AccelerationSubverbExtensionPoint):
                 else:
                     raise e
 
-            if not os.path.exists(symlink_path):
-                red("BOOT.BIN file " + symlink_path + " not found.")
-                sys.exit(1)
             green("- Found device BOOT.BIN file: " + str(symlink_path))
 
             # copy the corresponding file
@@ -345,7 +335,7 @@ class LinuxSubverb(AccelerationSubverbExtensionPoint):
 
         # re-using hypervisor tools, create a reference image
         auxdir = "/tmp/kernel"
-        run("mkdir -p " + auxdir, shell=True, timeout=1)
+        os.makedirs(auxdir, exist_ok=True)
 
         # save last image, delete rest
         if exists(firmware_dir + "/sd_card.img"):
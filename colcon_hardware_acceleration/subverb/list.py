@@ -4,14 +4,22 @@
 # list hardware acceleration technology solutions available
 import os
 
-from colcon_core.plugin_system import satisfies_version
 from colcon_hardware_acceleration.subverb import (
     AccelerationSubverbExtensionPoint,
     get_firmware_dir,
-    run,
+    get_firmware_root,
 )
-from colcon_hardware_acceleration import __version__
-from colcon_hardware_acceleration.verb import green, yellow, red
+from colcon_hardware_acceleration.verb import colored_batch, green
+
+
+def _firmware_entries(firmware_root):
+    """Get the (sorted) entries of firmware_root, hidden ones excluded
+
+    :param string firmware_root: path to "acceleration/firmware"
+    :rtype list
+    """
+    with os.scandir(firmware_root) as it:
+        return sorted(e.name for e in it if not e.name.startswith("."))
 
 
 def get_firmware_options():
@@ -19,12 +27,12 @@ def get_firmware_options():
 
     Looks into "acceleration/firmware"        
     """
-    current_dir = os.environ.get("PWD", "")
-    firmware_dir = current_dir + "/acceleration/firmware"
-    cmd = "ls " + firmware_dir
-    outs, errs = run(cmd, shell=True)
+    firmware_dir = get_firmware_root()
+    try:
+        firmware_options = _firmware_entries(firmware_dir)
+    except FileNotFoundError:
+        return []
 
-    firmware_options = outs.split("\n")
     if "select" in firmware_options: firmware_options.remove("select")
     return firmware_options
 
@@ -32,22 +40,18 @@ def get_firmware_options():
 class ListSubverb(AccelerationSubverbExtensionPoint):
     """List supported firmware for hardware acceleration."""
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0")
-
-
     def main(self, *, context):  # noqa: D102
         firmware_dir = get_firmware_dir()
         firmware_options = get_firmware_options()
         if firmware_dir:            
             target_firmware_dir = os.readlink(firmware_dir).split("/")[-1]
-            for firm in firmware_options:
-                if firm == target_firmware_dir:
-                    green(firm + "*")
-                else:
-                    print(firm)
-                
+            with colored_batch():
+                for firm in firmware_options:
+                    if firm == target_firmware_dir:
+                        green(firm + "*")
+                    else:
+                        print(firm)
+
                 # TODO: analyze each firmware directory and obtain more data
                 #   from the files directly, maybe with --verbose option.
                 #
@@ -4,7 +4,6 @@
 import os
 import sys
 
-from colcon_core.plugin_system import satisfies_version
 from colcon_hardware_acceleration.subverb import (
     AccelerationSubverbExtensionPoint,
     check_install_directory,
@@ -30,10 +29,6 @@ class MkinitramfsSubverb(AccelerationSubverbExtensionPoint):
     TODO: consider producing tar.gz files as well in the future if necessary.
     """
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0")
-
     def add_arguments(self, *, parser):  # noqa: D102
         parser.add_argument(
             "out_file",
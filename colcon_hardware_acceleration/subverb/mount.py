@@ -1,38 +1,36 @@
 # Copyright 2022 Víctor Mayoral-Vilches
 # Licensed under the Apache License, Version 2.0
 
-import os
-
-from colcon_core.plugin_system import satisfies_version
-from colcon_hardware_acceleration.subverb import (
-    AccelerationSubverbExtensionPoint,
-    get_rawimage_path,
-    mount_rawimage,
-    umount_rawimage,
-    run,
-)
-from colcon_hardware_acceleration import __version__
+from colcon_hardware_acceleration.subverb import AccelerationSubverbExtensionPoint
 
 
 class MountSubverb(AccelerationSubverbExtensionPoint):
     """Mount raw images."""
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0")
-
     def add_arguments(self, *, parser):  # noqa: D102
         argument = parser.add_argument(
             "partition",
             type=int,
             nargs="?",
-            help="Number of the partition to mount.",
+            default=2,
+            choices=range(1, 5),
+            metavar="partition",
+            help="Number of the partition to mount, 1 to 4 (defaults to 2).",
+        )
+        argument = parser.add_argument(
+            "--image-path",
+            dest="image_path",
+            default=None,
+            help="Pre-resolved raw image path, skips the firmware search.",
         )
 
     def main(self, *, context):  # noqa: D102
         """Mount raw SD image"""
-        rawimage_path = get_rawimage_path("sd_card.img")
-        partition = 2
-        if context.args.partition:
-            partition = context.args.partition
+        from colcon_hardware_acceleration.subverb import (
+            get_rawimage_path,
+            mount_rawimage,
+        )
+
+        rawimage_path = context.args.image_path or get_rawimage_path("sd_card.img")
+        partition = context.args.partition
         mount_rawimage(rawimage_path, partition)
@@ -5,24 +5,18 @@
 
 import os
 
-from colcon_core.plugin_system import satisfies_version
 from colcon_hardware_acceleration.subverb import (
     AccelerationSubverbExtensionPoint,
-    run,
+    get_firmware_root,
+    reset_path_cache,
 )
-from colcon_hardware_acceleration import __version__
-from colcon_hardware_acceleration.verb import green, yellow, red
+from colcon_hardware_acceleration.verb import red
 from colcon_hardware_acceleration.subverb.list import get_firmware_options
 
 
 class SelectSubverb(AccelerationSubverbExtensionPoint):
     """Select an existing firmware and default to it."""
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0")
-
-
     def add_arguments(self, *, parser):  # noqa: D102
         argument = parser.add_argument(
             "firmware",
@@ -38,16 +32,15 @@ class SelectSubverb(AccelerationSubverbExtensionPoint):
         firmware_candidate = str(context.args.firmware[0])
 
         # unlink previously selected firmware, if exists
-        current_dir = os.environ.get("PWD", "")
-        firmware_dir = current_dir + "/acceleration/firmware/select"
-        target_firmware_dir = current_dir + "/acceleration/firmware/" + firmware_candidate
-        if os.path.exists(firmware_dir):
-            cmd = "unlink " + firmware_dir
-            outs, errs = run(cmd, shell=True)
+        firmware_root = get_firmware_root()
+        firmware_dir = os.path.join(firmware_root, "select")
+        target_firmware_dir = os.path.join(firmware_root, firmware_candidate)
+        if os.path.lexists(firmware_dir):
+            os.unlink(firmware_dir)
 
         firmware_options = get_firmware_options()
         if firmware_candidate in firmware_options:
-            cmd = "ln -s " + target_firmware_dir + " " + firmware_dir
-            outs, errs = run(cmd, shell=True)
+            os.symlink(target_firmware_dir, firmware_dir)
+            reset_path_cache()
         else:
             red("'" + firmware_candidate + "' not found among firmware deployed. Try: " + str(firmware_options))
@@ -1,20 +1,16 @@
 # Copyright 2022 Víctor Mayoral-Vilches
 # Licensed under the Apache License, Version 2.0
 
-import os
-
-from colcon_core.plugin_system import satisfies_version
-from colcon_hardware_acceleration.subverb import AccelerationSubverbExtensionPoint, get_vitis_dir
+from colcon_hardware_acceleration.subverb import (
+    AccelerationSubverbExtensionPoint,
+    get_vitis_dir,
+)
 from colcon_hardware_acceleration import __version__
 
 
 class VersionSubverb(AccelerationSubverbExtensionPoint):
     """Report version of the tool."""
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0")
-
     def add_arguments(self, *, parser):  # noqa: D102
         argument = parser.add_argument(
             "component",
@@ -4,12 +4,10 @@
 import os
 import sys
 
-from colcon_core.plugin_system import satisfies_version
 from colcon_hardware_acceleration.subverb import (
     AccelerationSubverbExtensionPoint,
     get_vitis_dir,
     get_build_dir,
-    run,
     get_vivado_dir,
     get_vitis_hls_dir,
     get_platform_dir,
@@ -29,12 +27,6 @@ class VppSubverb(AccelerationSubverbExtensionPoint):
         - link: colcon vitis v++ "-l -t sw_emu --config ../../test/src/zcu102.cfg ./vadd.xo -o vadd.xclbin"
     """
 
-    def __init__(self):  # noqa: D107
-        super().__init__()
-        satisfies_version(
-            AccelerationSubverbExtensionPoint.EXTENSION_POINT_VERSION, "^1.0"
-        )
-
     def add_arguments(self, *, parser):  # noqa: D102
         parser.description += (
             "\n\n"
@@ -63,13 +55,13 @@ class VppSubverb(AccelerationSubverbExtensionPoint):
         # create the "build/v++"" directory (if it doesn't exist already)
         # NOTE 1: hardcoded
         vpp_dir = build_dir + "/v++"
-        cmd = "mkdir -p " + vpp_dir
-        outs, errs = run(cmd, shell=True, timeout=20)
-        if errs:
+        try:
+            os.makedirs(vpp_dir, exist_ok=True)
+        except OSError as e:
             red(
                 "Something went wrong while creating the build/v++ directory.\n"
                 + "Review the output: "
-                + errs
+                + str(e)
             )
             sys.exit(1)
 
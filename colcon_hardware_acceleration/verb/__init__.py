@@ -1,49 +1,135 @@
 # Copyright 2022 Víctor Mayoral-Vilches
 # Licensed under the Apache License, Version 2.0
 
-def black(text):
-    print("\033[30m", text, "\033[0m", sep="")
-
-
-def red(text):
-    print("\033[31m", text, "\033[0m", sep="")
-
-
-def redinline(text):
-    print("\033[31m", text, "\033[0m", end="")
-
-
-def green(text):
-    print("\033[32m", text, "\033[0m", sep="")
-
-
-def greeninline(text):
-    print("\033[32m", text, "\033[0m", end='')
-
-
-def yellow(text):
-    print("\033[33m", text, "\033[0m", sep="")
-
-
-def yellowinline(text):
-    print("\033[33m", text, "\033[0m", end="")
-
-
-def blue(text):
-    print("\033[34m", text, "\033[0m", sep="")
-
-
-def magenta(text):
-    print("\033[35m", text, "\033[0m", sep="")
-
-
-def cyan(text):
-    print("\033[36m", text, "\033[0m", sep="")
-
-
-def gray(text):
-    print("\033[90m", text, "\033[0m", sep="")
-
-
-def grayinline(text):
-    print("\033[90m", text, "\033[0m", end="")
+import contextlib
+import os
+import sys
+
+# ANSI foreground color codes, each color gets a "<color>" helper that
+# terminates the line and a "<color>inline" helper that doesn't
+_COLORS = {
+    "black": 30,
+    "red": 31,
+    "green": 32,
+    "yellow": 33,
+    "blue": 34,
+    "magenta": 35,
+    "cyan": 36,
+    "gray": 90,
+}
+
+__all__ = [
+    "Colorizer",
+    "PlainColorizer",
+    "colored_batch",
+    "black",
+    "blackinline",
+    "red",
+    "redinline",
+    "green",
+    "greeninline",
+    "yellow",
+    "yellowinline",
+    "blue",
+    "blueinline",
+    "magenta",
+    "magentainline",
+    "cyan",
+    "cyaninline",
+    "gray",
+    "grayinline",
+]
+
+
+class Colorizer:
+    """
+    Write ANSI colored text to a stream.
+
+    Provides one method per color in _COLORS plus its "inline" variant. If no
+    stream is given, sys.stdout is looked up on each call so that redirecting
+    it after import keeps working.
+    """
+
+    __slots__ = ("_stream",)
+
+    def __init__(self, stream=None):  # noqa: D107
+        self._stream = stream
+
+
+def _make_method(prefix, suffix):
+    def method(self, text):
+        stream = self._stream if self._stream is not None else sys.stdout
+        stream.write(f"{prefix}{text}{suffix}")
+
+    return method
+
+
+class PlainColorizer(Colorizer):
+    """Colorizer variant that writes the text without ANSI escape codes."""
+
+    __slots__ = ()
+
+
+for _name, _code in _COLORS.items():
+    setattr(Colorizer, _name, _make_method(f"\033[{_code}m", "\033[0m\n"))
+    setattr(Colorizer, _name + "inline", _make_method(f"\033[{_code}m", "\033[0m"))
+    setattr(PlainColorizer, _name, _make_method("", "\n"))
+    setattr(PlainColorizer, _name + "inline", _make_method("", ""))
+
+
+def _use_color(stream):
+    """
+    Check whether ANSI colors should be written to stream.
+
+    Colors are disabled by a non-empty NO_COLOR environment variable
+    (see https://no-color.org) and when stream is not a terminal.
+
+    :rtype: Bool
+    """
+    if os.environ.get("NO_COLOR"):
+        return False
+    isatty = getattr(stream, "isatty", None)
+    return bool(isatty and isatty())
+
+
+# module-level helpers, bound once to a shared instance picked at import time
+_colorizer = Colorizer() if _use_color(sys.stdout) else PlainColorizer()
+black = _colorizer.black
+blackinline = _colorizer.blackinline
+red = _colorizer.red
+redinline = _colorizer.redinline
+green = _colorizer.green
+greeninline = _colorizer.greeninline
+yellow = _colorizer.yellow
+yellowinline = _colorizer.yellowinline
+blue = _colorizer.blue
+blueinline = _colorizer.blueinline
+magenta = _colorizer.magenta
+magentainline = _colorizer.magentainline
+cyan = _colorizer.cyan
+cyaninline = _colorizer.cyaninline
+gray = _colorizer.gray
+grayinline = _colorizer.grayinline
+
+
+@contextlib.contextmanager
+def colored_batch():
+    """
+    Batch the lines written to sys.stdout and flush them once on exit.
+
+    Line buffering is disabled for the duration of the block (when the
+    stream supports it) so that printing a table of colored lines doesn't
+    flush once per line.
+    """
+    stream = sys.stdout
+    line_buffering = getattr(stream, "line_buffering", False) and hasattr(
+        stream, "reconfigure"
+    )
+    if line_buffering:
+        stream.reconfigure(line_buffering=False)
+    try:
+        yield
+    finally:
+        if line_buffering:
+            stream.reconfigure(line_buffering=True)
+        stream.flush()
@@ -0,0 +1,53 @@
+# Copyright 2022 Víctor Mayoral-Vilches
+# Licensed under the Apache License, Version 2.0
+
+import io
+
+from colcon_hardware_acceleration.verb import _use_color
+from colcon_hardware_acceleration.verb import Colorizer
+from colcon_hardware_acceleration.verb import PlainColorizer
+
+
+class _Terminal(io.StringIO):
+
+    def isatty(self):
+        return True
+
+
+def test_use_color(monkeypatch):
+    monkeypatch.delenv('NO_COLOR', raising=False)
+    assert _use_color(_Terminal())
+    # not a terminal, e.g. redirected to a file or piped
+    assert not _use_color(io.StringIO())
+    # no isatty() at all
+    assert not _use_color(object())
+
+
+def test_use_color_no_color(monkeypatch):
+    monkeypatch.setenv('NO_COLOR', '1')
+    assert not _use_color(_Terminal())
+
+    # an empty NO_COLOR doesn't disable colors
+    monkeypatch.setenv('NO_COLOR', '')
+    assert _use_color(_Terminal())
+
+
+def test_colorizer():
+    stream = io.StringIO()
+    colorizer = Colorizer(stream)
+    colorizer.red('error')
+    colorizer.grayinline('- ')
+    colorizer.green('done')
+    red, gray, green, reset = '\033[31m', '\033[90m', '\033[32m', '\033[0m'
+    assert stream.getvalue() == \
+        red + 'error' + reset + '\n' + gray + '- ' + reset + \
+        green + 'done' + reset + '\n'
+
+
+def test_plain_colorizer():
+    stream = io.StringIO()
+    colorizer = PlainColorizer(stream)
+    colorizer.red('error')
+    colorizer.grayinline('- ')
+    colorizer.green('done')
+    assert stream.getvalue() == 'error\n- done\n'
@@ -0,0 +1,62 @@
+# Copyright 2022 Víctor Mayoral-Vilches
+# Licensed under the Apache License, Version 2.0
+
+import io
+
+from colcon_hardware_acceleration.subverb import emulation
+
+MOUNTINFO = """\
+22 1 259:2 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw
+95 22 7:3 / /tmp/sdcard_img_p2 rw,relatime shared:51 - ext4 /dev/loop3 rw
+96 22 7:4 / /tmp/sdcard_img_p1 rw,relatime shared:52 - vfat /dev/loop4 rw
+"""
+
+
+def _files(monkeypatch, files):
+    def open_(path, *args, **kwargs):
+        if path not in files:
+            raise FileNotFoundError(path)
+        return io.StringIO(files[path])
+
+    monkeypatch.setattr(emulation, 'open', open_, raising=False)
+
+
+def test_loop_mount_source(monkeypatch):
+    _files(monkeypatch, {
+        '/proc/self/mountinfo': MOUNTINFO,
+        '/sys/block/loop3/loop/backing_file': '/ws/sd_card.img\n',
+        '/sys/block/loop3/loop/offset': '588251136\n',
+    })
+    assert emulation._loop_mount_source('/tmp/sdcard_img_p2') == \
+        ('/ws/sd_card.img', 588251136)
+
+
+def test_loop_mount_source_top_mount(monkeypatch):
+    # the last of the mounts stacked on the same mountpoint is the visible one
+    _files(monkeypatch, {
+        '/proc/self/mountinfo': MOUNTINFO +
+        '97 95 7:5 / /tmp/sdcard_img_p2 rw - ext4 /dev/loop5 rw\n',
+        '/sys/block/loop3/loop/backing_file': '/ws/sd_card.img\n',
+        '/sys/block/loop3/loop/offset': '588251136\n',
+        '/sys/block/loop5/loop/backing_file': '/ws/other.img\n',
+        '/sys/block/loop5/loop/offset': '0\n',
+    })
+    assert emulation._loop_mount_source('/tmp/sdcard_img_p2') == \
+        ('/ws/other.img', 0)
+
+
+def test_loop_mount_source_none(monkeypatch):
+    _files(monkeypatch, {
+        '/proc/self/mountinfo': MOUNTINFO,
+        '/sys/block/loop4/loop/backing_file': '/ws/sd_card.img\n',
+        '/sys/block/loop4/loop/offset': 'none\n',
+    })
+    # not mounted
+    assert emulation._loop_mount_source('/tmp/sdcard_img_p3') is None
+    # not a loop device
+    assert emulation._loop_mount_source('/') is None
+    # invalid loop device offset
+    assert emulation._loop_mount_source('/tmp/sdcard_img_p1') is None
+
+    _files(monkeypatch, {})
+    assert emulation._loop_mount_source('/tmp/sdcard_img_p2') is None
@@ -0,0 +1,54 @@
+# Copyright 2022 Víctor Mayoral-Vilches
+# Licensed under the Apache License, Version 2.0
+
+from colcon_hardware_acceleration import subverb
+
+FDISK_OUTPUT = """\
+Disk {path}: 3.2 GiB, 3432000000 bytes, 6703125 sectors
+Units: sectors of 1 * 512 = 512 bytes
+Sector size (logical/physical): 512 bytes / 512 bytes
+Disklabel type: dos
+
+Device{padding} Boot   Start     End Sectors  Size Id Type
+{path}{sep}1 *       2048 1148927 1146880  560M  c W95 FAT32 (LBA)
+{path}{sep}2      1148928 6703103 5554176  2.7G 83 Linux
+"""
+
+
+def _parse_fdisk(monkeypatch, path, sep=''):
+    outs = FDISK_OUTPUT.format(path=path, sep=sep, padding=' ' * len(path))
+    calls = []
+
+    def run(cmd, **kwargs):
+        calls.append((cmd, kwargs))
+        return outs, None
+
+    monkeypatch.setattr(subverb, 'run', run)
+    subverb._parse_fdisk.cache_clear()
+    result = subverb._parse_fdisk(path, 0)
+    assert [cmd for cmd, _ in calls] == [['fdisk', '-l', path]]
+    assert calls[0][1]['env']['LC_ALL'] == 'C'
+    return result
+
+
+def test_parse_fdisk(monkeypatch):
+    units, startsectors, _ = _parse_fdisk(monkeypatch, '/tmp/sd_card.img')
+    assert units == 512
+    # with and without the boot flag
+    assert startsectors == {1: 2048, 2: 1148928}
+
+
+def test_parse_fdisk_partition_prefix(monkeypatch):
+    # a "p" separates the partition number from a path ending in a digit
+    units, startsectors, _ = _parse_fdisk(monkeypatch, '/dev/loop0', sep='p')
+    assert units == 512
+    assert startsectors == {1: 2048, 2: 1148928}
+
+
+def test_parse_fdisk_failure(monkeypatch):
+    def run(cmd, **kwargs):
+        return None, 'fdisk: cannot open /tmp/missing.img'
+
+    monkeypatch.setattr(subverb, 'run', run)
+    subverb._parse_fdisk.cache_clear()
+    assert subverb._parse_fdisk('/tmp/missing.img', 0) == (None, {}, '')
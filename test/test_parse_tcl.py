@@ -0,0 +1,65 @@
+# Copyright 2022 Víctor Mayoral-Vilches
+# Licensed under the Apache License, Version 2.0
+
+from colcon_hardware_acceleration.subverb.hls import _parse_tcl
+import pytest
+
+TCL = """\
+open_project -reset project_simpleadder1
+set_top simple_adder
+add_files src/adder1.cpp
+open_solution solution_4ns -flow_target vitis
+set_part {xczu9eg-ffvb1156-2-e}
+create_clock -period 4
+open_solution solution_10ns -flow_target vitis
+set_part {xczu9eg-ffvb1156-2-e}
+create_clock -period 10
+csynth_design
+exit
+"""
+
+
+def _tcl(tmp_path, content):
+    path = tmp_path / 'adder1.tcl'
+    path.write_text(content)
+    return str(path), path.stat().st_mtime_ns
+
+
+def test_parse_tcl(tmp_path):
+    tcl_dic = _parse_tcl(*_tcl(tmp_path, TCL))
+    path = str(tmp_path / 'project_simpleadder1')
+    assert tcl_dic == {
+        'project': 'project_simpleadder1',
+        'path': path,
+        'top': 'simple_adder',
+        'solutions': [
+            {'solution_4ns': {
+                'clock': '4', 'path': path + '/solution_4ns'}},
+            {'solution_10ns': {
+                'clock': '10', 'path': path + '/solution_10ns'}},
+        ],
+    }
+
+
+def test_parse_tcl_first_match(tmp_path):
+    tcl_dic = _parse_tcl(*_tcl(
+        tmp_path,
+        TCL + 'open_project -reset project_other\nset_top other_top\n'))
+    assert tcl_dic['project'] == 'project_simpleadder1'
+    assert tcl_dic['top'] == 'simple_adder'
+
+
+def test_parse_tcl_mismatch(tmp_path):
+    # a solution without its clock
+    tcl = TCL.replace('create_clock -period 10\n', '')
+    with pytest.raises(ValueError, match='Size mismatch'):
+        _parse_tcl(*_tcl(tmp_path, tcl))
+
+
+def test_parse_tcl_incomplete(tmp_path):
+    for statement in ('open_project -reset', 'set_top'):
+        tcl = '\n'.join(
+            line for line in TCL.splitlines()
+            if not line.startswith(statement))
+        with pytest.raises(ValueError, match='lacks'):
+            _parse_tcl(*_tcl(tmp_path, tcl))
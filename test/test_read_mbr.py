@@ -0,0 +1,66 @@
+# Copyright 2022 Víctor Mayoral-Vilches
+# Licensed under the Apache License, Version 2.0
+
+from colcon_hardware_acceleration.subverb import _read_mbr
+from colcon_hardware_acceleration.subverb import get_rawimage_partitions
+
+
+def _mbr(*entries, signature=b'\x55\xaa'):
+    # entries as (boot flag, partition type, start sector)
+    sector = bytearray(512)
+    for i, (boot, kind, start) in enumerate(entries):
+        offset = 446 + 16 * i
+        sector[offset] = boot
+        sector[offset + 4] = kind
+        sector[offset + 8:offset + 12] = start.to_bytes(4, 'little')
+    sector[510:512] = signature
+    return bytes(sector)
+
+
+def _image(tmp_path, data):
+    path = tmp_path / 'sd_card.img'
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_read_mbr(tmp_path):
+    path = _image(tmp_path, _mbr((0x80, 0x0c, 2048), (0x00, 0x83, 1148928)))
+    assert _read_mbr(path) == {1: 2048, 2: 1148928}
+
+    # empty entries are skipped, not numbered away
+    path = _image(tmp_path, _mbr((0x00, 0x00, 0), (0x00, 0x83, 4096)))
+    assert _read_mbr(path) == {2: 4096}
+
+
+def test_read_mbr_fallback(tmp_path):
+    # no partition table signature
+    path = _image(tmp_path, _mbr((0x80, 0x0c, 2048), signature=b'\x00\x00'))
+    assert _read_mbr(path) is None
+
+    # a boot sector, not a partition table
+    path = _image(tmp_path, _mbr((0x12, 0x0c, 2048)))
+    assert _read_mbr(path) is None
+
+    # protective MBR of a GPT disk and extended partitions
+    for kind in (0xee, 0x05, 0x0f, 0x85):
+        path = _image(tmp_path, _mbr((0x00, 0x83, 2048), (0x00, kind, 4096)))
+        assert _read_mbr(path) is None
+
+    # no partitions at all
+    assert _read_mbr(_image(tmp_path, _mbr())) is None
+
+    # shorter than a sector
+    assert _read_mbr(_image(tmp_path, b'\x55\xaa')) is None
+
+
+def test_get_rawimage_partitions(tmp_path):
+    path = _image(tmp_path, _mbr((0x80, 0x0c, 2048), (0x00, 0x83, 1148928)))
+    units, startsectors, _ = get_rawimage_partitions(path)
+    assert units == 512
+    assert startsectors == {1: 2048, 2: 1148928}
+
+    units, startsectors, outs = get_rawimage_partitions(
+        str(tmp_path / 'missing.img'))
+    assert units is None
+    assert startsectors == {}
+    assert 'missing.img' in outs